@@ -0,0 +1,101 @@
+import hashlib
+import os
+
+import numpy as np
+
+from bracket_topology import DEFAULT_TOPOLOGY
+from calculate_odds import write_cache_file
+from exact_odds import advancement_probabilities
+from parallel_simulation import run_simulations
+from probability_models import resolve_odds
+
+ADVANCEMENT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "advancement_cache")
+ROUND_NAMES = ["Second Round", "Sweet 16", "Elite 8", "Final Four", "Championship", "Champion"]
+
+
+def odds_key(odds=None, topology=DEFAULT_TOPOLOGY):
+    """
+    Content hash of a model or odds table on a field.
+
+    Two models that give every pairing the same probability share a key,
+    whatever their class or parameterization.
+    """
+    table, index = resolve_odds(odds, topology)
+    teams = index[:topology.num_teams]
+    digest = hashlib.sha256()
+    for part in (table[:, teams[:, None], teams[None, :]], topology.slots):
+        digest.update(np.ascontiguousarray(part).tobytes())
+    return digest.hexdigest()[:32]
+
+
+def compute_advancement(odds=None, n=None, seed=None, topology=DEFAULT_TOPOLOGY, workers=1,
+                        chunk_size=65536):
+    """
+    The team x round advancement-probability matrix.
+
+    Args:
+        odds: Seed odds table or probability_models.ProbabilityModel
+            (defaults to calculate_odds.get_odds_table())
+        n: Simulated tournaments to estimate it from, or None for the
+            exact solution (exact_odds.advancement_probabilities)
+        seed: Root seed of the simulation
+        topology: Field
+        workers, chunk_size: As for parallel_simulation.run_simulations
+
+    Returns:
+        np.ndarray: (num_teams, num_rounds) float64; entry [t, r] is
+        P(team t wins its round-r game), so the last column is P(champion)
+    """
+    if n is None:
+        return advancement_probabilities(odds=odds, topology=topology)
+    aggregates = run_simulations(n, workers=workers, seed=seed, chunk_size=chunk_size,
+                                 topology=topology, odds=odds)
+    return aggregates.probabilities()
+
+
+def advancement_path(odds=None, n=None, seed=None, topology=DEFAULT_TOPOLOGY, workers=1,
+                     chunk_size=65536, cache_dir=ADVANCEMENT_CACHE_DIR):
+    """Cache file of the matrix for (model, seed, sample count)."""
+    if n is None:
+        name = f"{odds_key(odds, topology)}-exact"
+    else:
+        # Sampled results are bit-identical only for the same sharding
+        name = f"{odds_key(odds, topology)}-seed{seed}-n{n}-w{workers}-c{chunk_size}"
+    return os.path.join(cache_dir, name + ".npy")
+
+
+def load_advancement(odds=None, n=None, seed=None, topology=DEFAULT_TOPOLOGY, workers=1,
+                     chunk_size=65536, cache_dir=ADVANCEMENT_CACHE_DIR, mmap=True):
+    """
+    compute_advancement, cached on disk and memory-mapped.
+
+    Matrices are stored as .npy files keyed by the model's content hash,
+    the seed and the sample count (exact solutions need neither). Reading
+    one back is a memory map of a file, so any number of processes can
+    share it without parsing anything. Sampled matrices without a seed
+    are not reproducible and are never cached.
+
+    Returns:
+        np.ndarray: (num_teams, num_rounds) matrix; a read-only np.memmap
+        when it came from the cache and mmap is True
+    """
+    if n is not None and seed is None:
+        return compute_advancement(odds, n, seed, topology, workers, chunk_size)
+
+    path = advancement_path(odds, n, seed, topology, workers, chunk_size, cache_dir)
+    try:
+        return np.load(path, mmap_mode="r" if mmap else None)
+    except (OSError, ValueError):
+        pass
+
+    advancement = compute_advancement(odds, n, seed, topology, workers, chunk_size)
+    if not write_cache_file(path, lambda f: np.save(f, advancement)):
+        return advancement
+    return np.load(path, mmap_mode="r" if mmap else None)
+
+
+def read_advancement(source):
+    """Accept a matrix or the path of a cached .npy and return the matrix (memory-mapped)."""
+    if isinstance(source, (str, os.PathLike)):
+        return np.load(source, mmap_mode="r")
+    return np.asarray(source)
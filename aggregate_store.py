@@ -0,0 +1,311 @@
+import json
+import os
+
+import numpy as np
+
+from bracket_topology import DEFAULT_TOPOLOGY, BracketTopology
+from batch_simulation import simulate_tournaments
+from calculate_odds import make_rng
+from parallel_simulation import SimulationAggregates, run_simulations
+
+NUM_REGIONS = 4
+COUNTERS = ("num_tournaments", "wins", "upsets", "meetings", "pair_upsets", "final_fours")
+
+
+def _topology_meta(topology):
+    """What meta.json records about a store's field."""
+    return {
+        "slots": topology.slots.tolist(),
+        "seeds": topology.seeds.tolist(),
+        "names": list(topology.names),
+    }
+
+
+class AggregateStore(SimulationAggregates):
+    """
+    Fixed-size, additive counters over any number of simulated tournaments.
+
+    Extends parallel_simulation.SimulationAggregates, whose wins and
+    per-round upsets it counts the same way, with per-pairing and Final
+    Four counters.
+
+    Counters:
+        num_tournaments: (1,) tournaments counted
+        wins: (num_teams, num_rounds) games won per team and round;
+            wins[t, r] is how often team t reached round r + 1
+        upsets: (num_rounds,) games per round won by the worse seed
+        meetings: (num_rounds, num_seeds, num_seeds) games per round
+            between seeds a <= b, at [r, a - 1, b - 1]
+        pair_upsets: Same shape, games of those pairings won by the worse seed
+        final_fours: (k, k, k, k) counts of each Final Four, indexed by
+            every region champion's rank within its region (see
+            region_rank); k is the number of teams per region
+
+    Every counter is a plain sum over tournaments, so stores from separate
+    runs or workers merge by adding them, and every query reads a handful
+    of cells. A store created with a path keeps its counters in
+    memory-mapped .npy files in that directory, next to meta.json
+    describing the topology.
+    """
+
+    def __init__(self, topology=DEFAULT_TOPOLOGY, counters=None, path=None):
+        # SimulationAggregates.__init__ is not called: the tournament count
+        # lives in a (possibly read-only, memory-mapped) counter, see below
+        self.topology = topology
+        self.path = path
+        self.num_seeds = int(topology.seeds.max())
+
+        # Final Four: the winners of the round that leaves one team per region
+        num_slots = len(topology.slots)
+        self.region_round = topology.num_rounds - NUM_REGIONS.bit_length()
+        self.region_of = topology.positions * NUM_REGIONS // num_slots
+        order = np.lexsort((np.arange(topology.num_teams), self.region_of))
+        self.region_rank = np.empty(topology.num_teams, dtype=np.intp)
+        self.region_rank[order] = np.arange(topology.num_teams) - np.searchsorted(
+            self.region_of[order], self.region_of[order])
+        self.region_size = int(np.bincount(self.region_of, minlength=NUM_REGIONS).max())
+
+        if counters is None:
+            counters = {name: np.zeros(shape, dtype=np.int64) for name, shape in self.shapes().items()}
+        self._num_tournaments = counters["num_tournaments"]
+        self.wins = counters["wins"]
+        self.upsets = counters["upsets"]
+        self.meetings = counters["meetings"]
+        self.pair_upsets = counters["pair_upsets"]
+        self.final_fours = counters["final_fours"]
+
+    def shapes(self):
+        """Shape of every counter for this store's topology."""
+        topology = self.topology
+        pairs = (topology.num_rounds, self.num_seeds, self.num_seeds)
+        return {
+            "num_tournaments": (1,),
+            "wins": (topology.num_teams, topology.num_rounds),
+            "upsets": (topology.num_rounds,),
+            "meetings": pairs,
+            "pair_upsets": pairs,
+            "final_fours": (self.region_size,) * NUM_REGIONS,
+        }
+
+    def counters(self):
+        """Counter name -> array."""
+        return {
+            "num_tournaments": self._num_tournaments,
+            "wins": self.wins,
+            "upsets": self.upsets,
+            "meetings": self.meetings,
+            "pair_upsets": self.pair_upsets,
+            "final_fours": self.final_fours,
+        }
+
+    # Persistence
+
+    @classmethod
+    def create(cls, path, topology=DEFAULT_TOPOLOGY):
+        """Create an empty store backed by memory-mapped files in directory path."""
+        os.makedirs(path, exist_ok=True)
+        store = cls(topology)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(_topology_meta(topology), f)
+        counters = {}
+        for name, shape in store.shapes().items():
+            counters[name] = np.lib.format.open_memmap(
+                os.path.join(path, f"{name}.npy"), mode="w+", dtype=np.int64, shape=shape)
+        return cls(topology, counters, path)
+
+    @classmethod
+    def open(cls, path, mode="r+"):
+        """
+        Open a store created with create().
+
+        mode is the np.memmap mode: 'r+' to add to it, 'r' to query a store
+        other processes may be sharing.
+        """
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        topology = BracketTopology(meta["slots"], meta["seeds"], meta["names"])
+        counters = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+            for name in COUNTERS
+        }
+        return cls(topology, counters, path)
+
+    def save(self, path):
+        """Write a copy of this store to directory path and return it."""
+        store = AggregateStore.create(path, self.topology)
+        store.merge(self)
+        store.flush()
+        return store
+
+    def flush(self):
+        """Write memory-mapped counters back to disk."""
+        for counter in self.counters().values():
+            if isinstance(counter, np.memmap):
+                counter.flush()
+
+    # Accumulation
+
+    def add_winners(self, winners):
+        """Count a winners array from batch_simulation.simulate_tournaments."""
+        super().add_winners(winners)
+        topology = self.topology
+        num_seeds = self.num_seeds
+        # Byes rank below every seed and are left out of the pair counters
+        seeds = np.append(topology.seeds, num_seeds + 1).astype(np.intp)
+        pair_cells = topology.num_rounds * num_seeds * num_seeds
+
+        meetings = np.zeros(pair_cells, dtype=np.int64)
+        upsets = np.zeros(pair_cells, dtype=np.int64)
+        previous = np.broadcast_to(topology.slots, (len(winners), len(topology.slots)))
+        for r in range(topology.num_rounds):
+            round_winners = winners[:, topology.round_columns(r)]
+            seed1 = seeds[previous[:, 0::2]]
+            seed2 = seeds[previous[:, 1::2]]
+            played = np.maximum(seed1, seed2) <= num_seeds
+            better = np.minimum(seed1, seed2)[played] - 1
+            worse = np.maximum(seed1, seed2)[played] - 1
+            cells = (r * num_seeds + better) * num_seeds + worse
+            meetings += np.bincount(cells, minlength=pair_cells)
+            upset = seeds[round_winners][played] - 1 > better
+            upsets += np.bincount(cells[upset], minlength=pair_cells)
+            previous = round_winners
+
+        self.meetings += meetings.reshape(self.meetings.shape)
+        self.pair_upsets += upsets.reshape(self.pair_upsets.shape)
+
+        champions = winners[:, topology.round_columns(self.region_round)]
+        ranks = self.region_rank[champions]
+        cells = np.ravel_multi_index(ranks.T, self.final_fours.shape)
+        self.final_fours += np.bincount(
+            cells, minlength=self.final_fours.size).reshape(self.final_fours.shape)
+        return self
+
+    def merge(self, other):
+        """Add another store's counters into this one in place."""
+        if _topology_meta(other.topology) != _topology_meta(self.topology):
+            raise ValueError(f"Cannot merge a store of {other.topology!r} into one of {self.topology!r}: "
+                             "their teams or slots differ")
+        super().merge(other)
+        self.meetings += other.meetings
+        self.pair_upsets += other.pair_upsets
+        self.final_fours += other.final_fours
+        return self
+
+    def __add__(self, other):
+        return AggregateStore(self.topology).merge(self).merge(other)
+
+    def simulate(self, n, rng=None, chunk_size=65536, **kwargs):
+        """Simulate n tournaments into the store; kwargs go to simulate_tournaments."""
+        rng = make_rng(rng)
+        for start in range(0, n, chunk_size):
+            count = min(chunk_size, n - start)
+            self.add_winners(simulate_tournaments(count, rng, chunk_size=chunk_size,
+                                                  topology=self.topology, **kwargs))
+        return self
+
+    # Queries
+
+    @property
+    def num_tournaments(self):
+        return int(self._num_tournaments[0])
+
+    @num_tournaments.setter
+    def num_tournaments(self, value):
+        self._num_tournaments[0] = value
+
+    def round_reached_count(self, team, tournament_round):
+        """Tournaments in which team reached tournament_round (0 is the whole field)."""
+        if tournament_round == 0:
+            return self.num_tournaments
+        return int(self.wins[team, tournament_round - 1])
+
+    def advancement_probability(self, team, tournament_round):
+        """Estimated P(team wins its tournament_round game)."""
+        return self.wins[team, tournament_round] / max(self.num_tournaments, 1)
+
+    def _pair(self, seed_a, seed_b):
+        return min(seed_a, seed_b) - 1, max(seed_a, seed_b) - 1
+
+    def meeting_count(self, tournament_round, seed_a, seed_b):
+        """Games between the two seeds in tournament_round."""
+        better, worse = self._pair(seed_a, seed_b)
+        return int(self.meetings[tournament_round, better, worse])
+
+    def upset_count(self, tournament_round, seed_a, seed_b):
+        """Games between the two seeds in tournament_round won by the worse seed."""
+        better, worse = self._pair(seed_a, seed_b)
+        return int(self.pair_upsets[tournament_round, better, worse])
+
+    def upset_rate(self, tournament_round, seed_a, seed_b):
+        """Share of the pairing's games won by the worse seed (NaN if they never met)."""
+        meetings = self.meeting_count(tournament_round, seed_a, seed_b)
+        return self.upset_count(tournament_round, seed_a, seed_b) / meetings if meetings else float("nan")
+
+    def final_four_count(self, teams):
+        """Tournaments whose Final Four was exactly these teams, one per region."""
+        if sorted(self.region_of[list(teams)]) != list(range(NUM_REGIONS)):
+            raise ValueError("A Final Four needs one team from each region")
+        ranks = [0] * NUM_REGIONS
+        for team in teams:
+            ranks[self.region_of[team]] = self.region_rank[team]
+        return int(self.final_fours[tuple(ranks)])
+
+    def top_final_fours(self, k=10):
+        """
+        The k most frequent Final Fours.
+
+        Returns:
+            list: (team indices by region, count) tuples, most frequent first
+        """
+        flat = np.asarray(self.final_fours).ravel()
+        k = min(k, np.count_nonzero(flat))
+        best = np.argpartition(flat, -k)[-k:] if k else np.array([], dtype=np.intp)
+        best = best[np.argsort(flat[best])[::-1]]
+        team_at = {(int(self.region_of[t]), int(self.region_rank[t])): t for t in range(self.topology.num_teams)}
+        result = []
+        for cell in best:
+            ranks = np.unravel_index(cell, self.final_fours.shape)
+            result.append((tuple(team_at[(region, int(rank))] for region, rank in enumerate(ranks)),
+                           int(flat[cell])))
+        return result
+
+    def __repr__(self):
+        return f"AggregateStore({self.topology!r}, tournaments={self.num_tournaments}, path={self.path!r})"
+
+
+def merge_stores(paths, out_path):
+    """Add the stores at paths into a new store at out_path and return it."""
+    stores = [AggregateStore.open(path, mode="r") for path in paths]
+    if not stores:
+        raise ValueError("No stores to merge")
+    merged = AggregateStore.create(out_path, stores[0].topology)
+    for store in stores:
+        merged.merge(store)
+    merged.flush()
+    return merged
+
+
+def simulate_to_store(n, path=None, workers=1, seed=None, chunk_size=65536, topology=DEFAULT_TOPOLOGY,
+                      odds=None):
+    """
+    Simulate n tournaments across a process pool into one store.
+
+    Runs parallel_simulation.run_simulations with the store as its
+    aggregates, so each worker fills an in-memory store from its own
+    spawned stream and the shards are merged in submission order. If path
+    names an existing store the counts are added to it, which requires
+    that it was created for topology; otherwise a new store is created
+    there (or kept in memory if path is None).
+    """
+    if path is None:
+        store = AggregateStore(topology)
+    elif os.path.exists(os.path.join(path, "meta.json")):
+        store = AggregateStore.open(path)
+        if _topology_meta(store.topology) != _topology_meta(topology):
+            raise ValueError(f"Store at {path} is for {store.topology!r}, not the given {topology!r}")
+    else:
+        store = AggregateStore.create(path, topology)
+
+    run_simulations(n, workers, seed, chunk_size, topology, odds, aggregates=store)
+    store.flush()
+    return store
@@ -0,0 +1,236 @@
+import numpy as np
+
+from calculate_odds import make_rng
+from bracket_topology import DEFAULT_TOPOLOGY
+from probability_models import resolve_odds
+from schedule import get_schedule
+
+# The standard 64-team field; every function below also takes a
+# bracket_topology.BracketTopology for other field sizes
+INITIAL_SLOTS = DEFAULT_TOPOLOGY.slots
+TEAM_SEEDS = DEFAULT_TOPOLOGY.seeds
+# Games per round: 32, 16, 8, 4, 2, 1
+GAMES_PER_ROUND = DEFAULT_TOPOLOGY.games_per_round
+# Column offsets of each round in a (n, 63) winners array
+ROUND_OFFSETS = DEFAULT_TOPOLOGY.round_offsets
+NUM_GAMES = DEFAULT_TOPOLOGY.num_games
+# Initial slot position of each team index
+SLOT_POSITIONS = DEFAULT_TOPOLOGY.positions
+
+def split_rounds(winners, topology=DEFAULT_TOPOLOGY):
+    """Split a (n, 63) winners array into a list of per-round (n, games) views."""
+    return [winners[:, topology.round_columns(r)] for r in range(topology.num_rounds)]
+
+def resolve_locks(locked, topology=DEFAULT_TOPOLOGY):
+    """
+    Turn known game results into a per-game array of fixed winners.
+
+    Args:
+        locked: dict mapping (round, slot) -> winning team index, where slot
+            is the game's position within the round in slot order (0-31 for
+            round 0, 0-15 for round 1, ...). A team locked into a later
+            round is also locked as the winner of all its earlier games.
+        topology: Field the slots refer to
+
+    Returns:
+        np.ndarray: (num_games,) int16 array of locked winners, -1 where
+        undecided
+    """
+    fixed = np.full(topology.num_games, -1, dtype=np.int16)
+
+    for (tournament_round, slot), team in locked.items():
+        if not (0 <= tournament_round < topology.num_rounds and
+                0 <= slot < topology.games_per_round[tournament_round]):
+            raise ValueError(f"Invalid game: round {tournament_round}, slot {slot}")
+        position = int(topology.positions[team])
+        if position >> (tournament_round + 1) != slot:
+            raise ValueError(f"Team {team} cannot play in round {tournament_round}, slot {slot}")
+
+        for r in range(tournament_round + 1):
+            col = topology.round_offsets[r] + (position >> (r + 1))
+            if fixed[col] not in (-1, team):
+                raise ValueError(f"Conflicting locked results for round {r}, slot {col - topology.round_offsets[r]}")
+            fixed[col] = team
+
+    return fixed
+
+def locks_from_games(games, topology=DEFAULT_TOPOLOGY):
+    """
+    Build a locked-results dict from played games.
+
+    Args:
+        games: GameRecords or game dicts (team names as in
+            simulate_tournament, i.e. team index + 1)
+        topology: Field the games belong to
+
+    Returns:
+        dict: (round, slot) -> winning team index, for resolve_locks
+    """
+    locked = {}
+    for game in games:
+        winner = game["team1"] if game["team1_win"] else game["team2"]
+        team = int(winner) - 1
+        tournament_round = int(game["tournament_round"])
+        locked[(tournament_round, int(topology.positions[team]) >> (tournament_round + 1))] = team
+    return locked
+
+def _play(team1, team2, uniforms, index, odds, proposal=None, log_weights=None, bye=None,
+          proposal_index=None):
+    odds = odds[index[team1], index[team2]]
+    if proposal is None:
+        winners = np.where(uniforms < odds, team1, team2)
+    else:
+        # Draw from the proposal and carry the likelihood ratio of the outcome
+        tilted = proposal[proposal_index[team1], proposal_index[team2]]
+        team1_wins = uniforms < tilted
+        log_ratio = np.where(team1_wins, np.log(odds / tilted), np.log((1 - odds) / (1 - tilted)))
+        if bye is not None:
+            log_ratio[(team1 == bye) | (team2 == bye)] = 0
+        log_weights += log_ratio.sum(axis=1)
+        winners = np.where(team1_wins, team1, team2)
+
+    if bye is not None:
+        # A team facing a bye advances; two byes leave a bye
+        winners = np.where(team2 == bye, team1, np.where(team1 == bye, team2, winners))
+    return winners
+
+def _simulate_chunk(slots, rng, out, fixed=None, proposal=None, log_weights=None,
+                    uniforms=None, odds_table=None, topology=DEFAULT_TOPOLOGY):
+    odds_table, index = resolve_odds(odds_table, topology)
+    proposal_index = None
+    if proposal is not None:
+        proposal, proposal_index = resolve_odds(proposal, topology)
+    bye = topology.bye if topology.has_byes else None
+    for r in range(topology.num_rounds):
+        cols = topology.round_columns(r)
+        odds = odds_table[topology.odds_rounds[r]]
+        tilted = None if proposal is None else proposal[topology.odds_rounds[r]]
+        team1 = slots[:, 0::2]
+        team2 = slots[:, 1::2]
+        round_fixed = None if fixed is None else fixed[cols]
+        if uniforms is None:
+            round_uniforms = None
+        else:
+            # Common random numbers: game g always uses column g
+            round_uniforms = uniforms[:, cols]
+
+        if round_fixed is None or (round_fixed < 0).all():
+            if round_uniforms is None:
+                round_uniforms = rng.random(team1.shape)
+            slots = _play(team1, team2, round_uniforms, index, odds, tilted, log_weights, bye,
+                          proposal_index)
+        else:
+            # Known results are shared by every sample; draw only the rest
+            slots = np.empty(team1.shape, dtype=topology.dtype)
+            slots[:] = np.maximum(round_fixed, 0)
+            free = np.flatnonzero(round_fixed < 0)
+            if len(free):
+                if round_uniforms is None:
+                    free_uniforms = rng.random((len(slots), len(free)))
+                else:
+                    free_uniforms = round_uniforms[:, free]
+                slots[:, free] = _play(team1[:, free], team2[:, free], free_uniforms, index,
+                                       odds, tilted, log_weights, bye, proposal_index)
+        out[:, cols] = slots
+
+def draw_uniforms(n, rng=None, topology=DEFAULT_TOPOLOGY):
+    """
+    One uniform draw per (tournament, game), for common random numbers.
+
+    Passing the same matrix to simulate_tournaments under two odds tables
+    plays every game of every tournament off the same random number, so
+    the two runs differ only where the configurations do.
+    """
+    return make_rng(rng).random((n, topology.num_games))
+
+def _resolve_fixed(locked, topology):
+    if locked is None:
+        return None
+    return resolve_locks(locked, topology) if isinstance(locked, dict) else np.asarray(locked)
+
+def simulate_tournaments(n, rng=None, chunk_size=65536, locked=None, uniforms=None, odds=None,
+                         topology=DEFAULT_TOPOLOGY, return_days=False):
+    """
+    Simulate n full tournaments at once.
+
+    Each round is resolved for every tournament in the chunk with a single
+    array draw against the odds table, so the cost per tournament is a
+    handful of NumPy operations rather than 63 Python-level matchups.
+
+    Args:
+        n: Number of tournaments to simulate
+        rng: np.random.Generator or seed (see calculate_odds.make_rng);
+            fresh entropy if None
+        chunk_size: Tournaments resolved per batch, bounds temporary memory
+        locked: Known results, either a (round, slot) -> team dict or the
+            array from resolve_locks; only the undecided games are drawn
+        uniforms: Optional (n, 63) matrix from draw_uniforms to use instead
+            of fresh draws (common random numbers)
+        odds: (6, 16, 16) seed odds table or a
+            probability_models.ProbabilityModel for the field's teams
+            (defaults to calculate_odds.get_odds_table())
+        topology: bracket_topology.BracketTopology of the field (the
+            standard 64-team field by default)
+        return_days: Also return the day column
+
+    Returns:
+        np.ndarray: (n, 63) uint8 array of winning team indices (or
+        (n, topology.num_games) of topology.dtype). Columns are games in
+        slot order, round by round (see ROUND_OFFSETS/split_rounds); the
+        last column is the champion. Games decided by a bye hold the
+        advancing team, or topology.bye if both sides were byes.
+
+        With return_days, a (winners, days) tuple; days is a read-only
+        (n, num_games) int8 view of the fixed schedule.Schedule day of
+        every game, so it costs no pass over the results.
+    """
+    rng = make_rng(rng)
+    fixed = _resolve_fixed(locked, topology)
+    if uniforms is not None and uniforms.shape != (n, topology.num_games):
+        raise ValueError(f"uniforms must have shape ({n}, {topology.num_games})")
+
+    winners = np.empty((n, topology.num_games), dtype=topology.dtype)
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        slots = np.broadcast_to(topology.slots, (stop - start, len(topology.slots)))
+        chunk_uniforms = None if uniforms is None else uniforms[start:stop]
+        _simulate_chunk(slots, rng, winners[start:stop], fixed,
+                        uniforms=chunk_uniforms, odds_table=odds, topology=topology)
+
+    if return_days:
+        return winners, np.broadcast_to(get_schedule(topology).game_days, winners.shape)
+    return winners
+
+def simulate_tournaments_weighted(n, proposal, rng=None, chunk_size=65536, locked=None, odds=None,
+                                  topology=DEFAULT_TOPOLOGY):
+    """
+    Importance-sampled simulate_tournaments.
+
+    Games are drawn from `proposal` (see importance_sampling.tilt_odds),
+    and every tournament carries the likelihood ratio of its outcomes
+    under the real odds versus the proposal. Averaging weight * indicator
+    over the samples is an unbiased estimate of the indicator's
+    probability under the real odds.
+
+    Args:
+        proposal, odds: Each a (6, 16, 16) seed odds table or a
+            probability_models.ProbabilityModel for the field's teams;
+            odds defaults to calculate_odds.get_odds_table()
+        Others: As for simulate_tournaments
+
+    Returns:
+        winners: (n, 63) uint8 array as from simulate_tournaments
+        weights: (n,) float64 likelihood-ratio weights
+    """
+    rng = make_rng(rng)
+    fixed = _resolve_fixed(locked, topology)
+
+    winners = np.empty((n, topology.num_games), dtype=topology.dtype)
+    log_weights = np.zeros(n)
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        slots = np.broadcast_to(topology.slots, (stop - start, len(topology.slots)))
+        _simulate_chunk(slots, rng, winners[start:stop], fixed, proposal, log_weights[start:stop],
+                        odds_table=odds, topology=topology)
+
+    return winners, np.exp(log_weights)
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the odds and simulation hot paths.
+
+    python benchmark.py                          # print results as JSON
+    python benchmark.py --save-baseline          # store them as the baseline
+    python benchmark.py --compare                # diff against the baseline
+
+Every result is a rate or a size with a direction, so comparisons can be
+reported as a signed percentage where negative always means worse. Results
+with an absolute target in LIMITS fail the run (exit status 1) whenever
+they miss it, baseline or not.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import calculate_odds
+from calculate_odds import get_odds, get_odds_batch
+from bracket import simulate_tournament
+from batch_simulation import simulate_tournaments
+
+# Baselines are per machine, so the default one is git-ignored
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+BATCH_SIZES = [1_000, 100_000, 1_000_000]
+# Absolute targets, checked on every run: a fresh interpreter must import
+# bracket and simulate one tournament well within 50 ms
+LIMITS = {"cold_start_ms": 50.0}
+
+
+def _summarize(samples):
+    """
+    Median of repeated samples and its standard error in percent, from
+    the median absolute deviation so that one disturbed sample moves
+    neither.
+    """
+    samples = np.asarray(samples, dtype=float)
+    median = float(np.median(samples))
+    mad = float(np.median(np.abs(samples - median)))
+    # 1.4826 * MAD estimates the std; the median's error is ~1.253 std / sqrt(n)
+    noise = 1.253 * 1.4826 * mad / np.sqrt(len(samples)) / median * 100 if median else 0.0
+    return median, noise
+
+
+def _rate_sampler(func, scale=1, min_time=0.2):
+    """
+    Sampler returning scale * calls per second of func(), measured by
+    calling it for at least min_time seconds.
+    """
+    func()  # warm up caches and lazy loads
+
+    def sample():
+        calls = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            func()
+            calls += 1
+            elapsed = time.perf_counter() - start
+        return calls / elapsed * scale
+
+    return sample
+
+
+def bench_odds_lookups():
+    seeds = [(s1, s2, r) for r in range(6) for s1 in range(1, 17) for s2 in range(1, 17)]
+
+    def scalar():
+        for s1, s2, r in seeds:
+            get_odds(s1, s2, r)
+
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    seeds1 = rng.integers(1, 17, n)
+    seeds2 = rng.integers(1, 17, n)
+    rounds = rng.integers(0, 6, n)
+
+    return {
+        "odds_lookups_per_sec": (_rate_sampler(scalar, len(seeds)), "lookups/s", True),
+        "odds_batch_lookups_per_sec": (_rate_sampler(lambda: get_odds_batch(seeds1, seeds2, rounds), n),
+                                       "lookups/s", True),
+    }
+
+
+def bench_simulate_tournament():
+    rng = np.random.default_rng(0)
+    return {
+        "simulate_tournament_per_sec": (_rate_sampler(lambda: simulate_tournament(rng)), "tournaments/s", True),
+    }
+
+
+def bench_batch(sizes=BATCH_SIZES):
+    rng = np.random.default_rng(0)
+    results = {}
+    for n in sizes:
+        results[f"batch_{n}_per_sec"] = (
+            _rate_sampler(lambda n=n: simulate_tournaments(n, rng), n, min_time=0.5), "tournaments/s", True)
+
+        # Allocation is deterministic, so one measurement is enough
+        tracemalloc.start()
+        simulate_tournaments(n, rng)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[f"batch_{n}_peak_mb"] = (lambda peak=peak: peak / 2**20, "MB", False)
+    return results
+
+
+def bench_import_time():
+    """Wall time for a fresh interpreter to import bracket and simulate once."""
+    code = (
+        "import time; t = time.perf_counter(); import bracket; bracket.simulate_tournament(); "
+        "print(time.perf_counter() - t)"
+    )
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def sample():
+        out = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True, check=True)
+        return float(out.stdout.strip()) * 1000
+
+    return {"cold_start_ms": (sample, "ms", False)}
+
+
+def run_benchmarks(batch_sizes=BATCH_SIZES, repeats=7):
+    """
+    Run every benchmark `repeats` times and report each one's median.
+
+    The repeats are interleaved, one sample of every benchmark per pass,
+    so a slow spell on the machine lands on all of them instead of on
+    every sample of one, and shows up in their noise_pct (see
+    _summarize) rather than as a shift in their value.
+    """
+    calculate_odds.get_odds_table()  # exclude the one-off data load from the rates
+    cases = {}
+    for bench in (bench_odds_lookups, bench_simulate_tournament, bench_import_time):
+        cases.update(bench())
+    cases.update(bench_batch(batch_sizes))
+
+    samples = {name: [] for name in cases}
+    for _ in range(repeats):
+        for name, (sample, _, _) in cases.items():
+            samples[name].append(sample())
+
+    results = {}
+    for name, (_, unit, higher) in cases.items():
+        value, noise = _summarize(samples[name])
+        results[name] = {"value": value, "noise_pct": noise, "unit": unit, "higher_is_better": higher}
+    return {
+        "machine": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=5.0, noise_sigmas=3.0):
+    """
+    Compare two benchmark reports.
+
+    A metric regresses when it gets worse by more than threshold percent
+    and by more than noise_sigmas times the combined noise of the two
+    measurements, so a noisy machine does not report its own jitter.
+
+    Returns:
+        list: (name, baseline value, current value, change %, regressed)
+        tuples; change % is signed so that negative is always worse.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        old = baseline["results"][name]["value"]
+        new = result["value"]
+        change = (new - old) / old * 100 if old else 0.0
+        if not result["higher_is_better"]:
+            change = -change
+        noise = float(np.hypot(result.get("noise_pct", 0.0), baseline["results"][name].get("noise_pct", 0.0)))
+        rows.append((name, old, new, change, change < -max(threshold, noise_sigmas * noise)))
+    return rows
+
+
+def check_limits(report, limits=LIMITS):
+    """
+    Results that miss their absolute target in limits.
+
+    Returns:
+        list: (name, value, limit) tuples; a limit is a maximum for
+        results where lower is better and a minimum otherwise
+    """
+    failures = []
+    for name, limit in limits.items():
+        result = report["results"].get(name)
+        if result is None:
+            continue
+        value = result["value"]
+        if (value < limit) if result["higher_is_better"] else (value > limit):
+            failures.append((name, value, limit))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--compare", action="store_true", help="Compare against the baseline")
+    parser.add_argument("--threshold", type=float, default=5.0, help="Regression threshold in percent")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=BATCH_SIZES)
+    parser.add_argument("--repeats", type=int, default=7, help="Samples per benchmark")
+    args = parser.parse_args()
+    if args.compare and not os.path.exists(args.baseline):
+        parser.error(f"no baseline at {args.baseline}; run with --save-baseline first")
+
+    report = run_benchmarks(args.batch_sizes, args.repeats)
+    failures = check_limits(report)
+    report["limits"] = {
+        name: {"limit": limit, "passed": name not in {row[0] for row in failures}}
+        for name, limit in LIMITS.items() if name in report["results"]
+    }
+
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        report["comparison"] = {
+            name: {"baseline": old, "current": new, "change_pct": change, "regressed": regressed}
+            for name, old, new, change, regressed in rows
+        }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({k: v for k, v in report.items() if k not in ("comparison", "limits")}, f, indent=2)
+
+    for name, value, limit in failures:
+        unit = report["results"][name]["unit"]
+        print(f"LIMIT MISSED: {name} = {value:.1f} {unit} (limit {limit:g} {unit})", file=sys.stderr)
+
+    if args.compare:
+        print("\nChange vs baseline (negative is worse):", file=sys.stderr)
+        for name, old, new, change, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"  {name:32s} {change:+7.1f}%{flag}", file=sys.stderr)
+    if failures or (args.compare and any(row[-1] for row in rows)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,33 @@
-from calculate_odds import get_win, get_odds
+from calculate_odds import get_odds
 from collections import defaultdict
 from collections import Counter
-import pandas as pd
-import random  # Added for random day assignment
+import csv
+import random
+
+NUM_REGIONS = 4
+NUM_ROUNDS = 6
+# Rounds with at least this many games are played over two days
+MIN_SPLIT_GAMES = 4
+
+def _split_days(games):
+    # schedule.Schedule's rule for a full field, in plain Python so the
+    # scalar simulator never loads numpy: a split round puts the first half
+    # of each region's games on day 1, or the first half of the bracket
+    # when a region has a single game
+    if games < MIN_SPLIT_GAMES:
+        return [1] * games
+    per_region = games // NUM_REGIONS
+    if per_region >= 2:
+        return ([1] * (per_region // 2) + [2] * (per_region - per_region // 2)) * NUM_REGIONS
+    return [1] * (games // 2) + [2] * (games - games // 2)
+
+# Day of each game of each round, in bracket order (schedule checks that
+# these match its game_days)
+ROUND_DAYS = [_split_days(32 >> r) for r in range(NUM_ROUNDS)]
 
 def create_tournament():
+    # The default 64-team field; bracket_topology.topology_from_teams
+    # builds DEFAULT_TOPOLOGY from it
     regions = ["East", "West", "South", "Midwest"]
     teams = []
     team_id = 1
@@ -38,86 +61,150 @@ def create_region_matchups(teams):
     
     return matchups
 
-def simulate_matchup(matchup, tournament_round):
-    team1 = matchup["team1"]
-    team2 = matchup["team2"]
-    
-    winning_seed = get_win(team1["seed"], team2["seed"], tournament_round)
-    winner = team1 if winning_seed == team1["seed"] else team2
-    loser = team2 if winner == team1 else team1
+class GameRecord:
+    """
+    Compact record of one simulated game.
+
+    Teams are stored as integer ids (the numeric team name) with their
+    seeds, so a game is a single small object instead of nested team
+    dicts. Read-only item access (game["team1_win"]) is kept for code
+    written against the old dict games; use to_dict()/games_to_dicts for
+    the exact dict shape the visualizers and bracket_results.csv expect.
+    """
+    __slots__ = ("team1", "team2", "seed_team1", "seed_team2", "odds_team1",
+                 "team1_win", "tournament_round", "day")
+
+    def __init__(self, team1, team2, seed_team1, seed_team2, odds_team1,
+                 team1_win, tournament_round, day=1):
+        self.team1 = team1
+        self.team2 = team2
+        self.seed_team1 = seed_team1
+        self.seed_team2 = seed_team2
+        self.odds_team1 = odds_team1
+        self.team1_win = team1_win
+        self.tournament_round = tournament_round
+        self.day = day
+
+    @property
+    def winner(self):
+        """(team id, seed) of the winning team"""
+        if self.team1_win:
+            return (self.team1, self.seed_team1)
+        return (self.team2, self.seed_team2)
+
+    @property
+    def loser(self):
+        """(team id, seed) of the losing team"""
+        if self.team1_win:
+            return (self.team2, self.seed_team2)
+        return (self.team1, self.seed_team1)
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __repr__(self):
+        return f"GameRecord({self.to_dict()})"
+
+    def to_dict(self):
+        """Convert to the dict shape simulate_tournament used to return"""
+        return {
+            "team1": str(self.team1),
+            "team2": str(self.team2),
+            "seed_team1": self.seed_team1,
+            "seed_team2": self.seed_team2,
+            "odds_team1": self.odds_team1,
+            "team1_win": self.team1_win,
+            "tournament_round": self.tournament_round,
+            "day": self.day
+        }
+
+def games_to_dicts(games):
+    """Convert a list of GameRecords to the list-of-dicts game format"""
+    return [game.to_dict() for game in games]
+
+def _compact_matchup(matchup):
+    # create_region_matchups yields team dicts; later rounds are already
+    # ((id, seed), (id, seed)) pairs
+    if isinstance(matchup, dict):
+        team1 = matchup["team1"]
+        team2 = matchup["team2"]
+        return (int(team1["name"]), team1["seed"]), (int(team2["name"]), team2["seed"])
+    return matchup
+
+def simulate_matchup(matchup, tournament_round, rng=None):
+    # rng: np.random.Generator or random.Random, global random if None
+    if rng is None:
+        rng = random
+    (team1, seed1), (team2, seed2) = _compact_matchup(matchup)
     
     # Calculate odds of team1 winning
-    team1_win_odds = get_odds(team1["seed"], team2["seed"], tournament_round)
+    team1_win_odds = get_odds(seed1, seed2, tournament_round)
     # Record if team1 won (1) or lost (0)
-    team1_win = 1 if winner == team1 else 0
-    
-    return {
-        "team1": team1,
-        "team2": team2,
-        "winner": winner,
-        "loser": loser,
-        "team1_seed": team1["seed"],
-        "team2_seed": team2["seed"],
-        "team1_win_odds": team1_win_odds,
-        "team1_win": team1_win
-    }
-
-def simulate_round(matchups, tournament_round, days=1):
-    results = []
+    team1_win = 1 if rng.random() < team1_win_odds else 0
+    
+    return GameRecord(team1, team2, seed1, seed2, team1_win_odds, team1_win, tournament_round)
+
+def round_days(tournament_round, region=None):
+    """
+    Day of each game of tournament_round (see ROUND_DAYS).
+
+    Args:
+        tournament_round: Round (0-5)
+        region: Index of a region (in create_tournament order) to get just
+            its games, or None for every game of the round
+
+    Returns:
+        list: Days (1 or 2) in bracket order
+    """
+    days = ROUND_DAYS[tournament_round]
+    if region is not None:
+        per_region = len(days) // NUM_REGIONS
+        days = days[region * per_region:(region + 1) * per_region]
+    return days
+
+def simulate_round(matchups, tournament_round, days=None, rng=None):
+    # days: Day of each matchup's game (see round_days), all day 1 if None
+    if rng is None:
+        rng = random
+    if days is None:
+        days = [1] * len(matchups)
     games = []
     
-    # If there are two days, create balanced day assignments
-    if days == 2:
-        num_matchups = len(matchups)
-        # Create a balanced list of day assignments
-        day_assignments = [1] * (num_matchups // 2) + [2] * (num_matchups - num_matchups // 2)
-        # Shuffle the day assignments
-        random.shuffle(day_assignments)
-    
-    for idx, matchup in enumerate(matchups):
-        result = simulate_matchup(matchup, tournament_round)
-        results.append(result)
-        team1 = result["team1"]
-        team2 = result["team2"]
-        winner = result["winner"]
-        loser = result["loser"]
-        
-        # Assign day based on number of days in the round
-        if days == 1:
-            day = 1
-        else:
-            day = day_assignments[idx]
-        
-        # Create game entry for the returned data structure
-        game_data = {
-            "team1": team1["name"],
-            "team2": team2["name"],
-            "seed_team1": team1["seed"],
-            "seed_team2": team2["seed"],
-            "odds_team1": result["team1_win_odds"],
-            "team1_win": result["team1_win"],
-            "tournament_round": tournament_round,
-            "day": day  # Add day information to game data
-        }
-        games.append(game_data)
+    for matchup, day in zip(matchups, days):
+        game = simulate_matchup(matchup, tournament_round, rng)
+        game.day = day
+        games.append(game)
         
-        # print(f"{team1['name']} (Seed {team1['seed']}) vs {team2['name']} (Seed {team2['seed']}) => {winner['name']} defeats {loser['name']}")
+        # print(f"{game.team1} (Seed {game.seed_team1}) vs {game.team2} (Seed {game.seed_team2}) => {game.winner[0]} defeats {game.loser[0]}")
     
-    return results, games
+    return games
 
 def create_next_round(results):
     next_matchups = []
     
     for i in range(0, len(results), 2):
         if i + 1 < len(results):
-            next_matchups.append({
-                "team1": results[i]["winner"],
-                "team2": results[i+1]["winner"]
-            })
+            next_matchups.append((results[i].winner, results[i+1].winner))
     
     return next_matchups
 
-def simulate_tournament():
+def simulate_tournament(rng=None):
+    """
+    Simulate one full tournament.
+
+    This scalar simulator covers only the default 64-team field (4 regions
+    of seeds 1-16, 63 games), so it stays pure Python and cheap to start.
+    For other bracket_topology fields (e.g. build_topology(68) with
+    play-ins) use batch_simulation.simulate_tournaments(topology=...).
+
+    Args:
+        rng: np.random.Generator or random.Random used for every draw;
+            the global random module if None. Pass a seeded generator to
+            make the run reproducible.
+
+    Returns:
+        list: GameRecords for all 63 games
+    """
     # Create initial 64 teams
     teams = create_tournament()
     
@@ -134,59 +221,48 @@ def simulate_tournament():
     
     # Simulate rounds within each region
     region_winners = []
-    for region_name, region_teams in regions.items():
+    for region, (region_name, region_teams) in enumerate(regions.items()):
         # print(f"\n=== {region_name} Region ===")
         
         # First Round (8 matchups) - 2 days
         matchups = create_region_matchups(region_teams)
-        first_round_results, first_round_games = simulate_round(matchups, 0, days=2)
+        first_round_games = simulate_round(matchups, 0, round_days(0, region), rng=rng)
         all_games.extend(first_round_games)
         
         # Second Round (4 matchups) - 2 days
-        second_round_matchups = create_next_round(first_round_results)
-        second_round_results, second_round_games = simulate_round(second_round_matchups, 1, days=2)
+        second_round_matchups = create_next_round(first_round_games)
+        second_round_games = simulate_round(second_round_matchups, 1, round_days(1, region), rng=rng)
         all_games.extend(second_round_games)
         
         # Sweet 16 (2 matchups) - 2 days
-        sweet16_matchups = create_next_round(second_round_results)
-        sweet16_results, sweet16_games = simulate_round(sweet16_matchups, 2, days=2)
+        sweet16_matchups = create_next_round(second_round_games)
+        sweet16_games = simulate_round(sweet16_matchups, 2, round_days(2, region), rng=rng)
         all_games.extend(sweet16_games)
         
-        # Elite 8 (1 matchup - determines region winner) - initially assign day 1 to all
-        elite8_matchups = create_next_round(sweet16_results)
-        elite8_results, elite8_games = simulate_round(elite8_matchups, 3, days=1)
+        # Elite 8 (1 matchup - determines region winner) - first two regions
+        # play on day 1, the last two on day 2
+        elite8_matchups = create_next_round(sweet16_games)
+        elite8_games = simulate_round(elite8_matchups, 3, round_days(3, region), rng=rng)
         all_games.extend(elite8_games)
         
         # Save the region winner
-        region_winner = elite8_results[0]["winner"]
-        region_winners.append(region_winner)
-    
-    # Post-process Elite 8 games to balance across 2 days
-    # Find all Elite 8 games
-    elite8_indices = [i for i, game in enumerate(all_games) if game["tournament_round"] == 3]
-    
-    # Assign 2 games to day 1 and 2 games to day 2
-    for i, idx in enumerate(elite8_indices):
-        if i < 2:  # First two games
-            all_games[idx]["day"] = 1
-        else:      # Last two games
-            all_games[idx]["day"] = 2
+        region_winners.append(elite8_games[0].winner)
     
     # Final Four - 1 day
     final_four_matchups = [
-        {"team1": region_winners[0], "team2": region_winners[1]},
-        {"team1": region_winners[2], "team2": region_winners[3]}
+        (region_winners[0], region_winners[1]),
+        (region_winners[2], region_winners[3])
     ]
-    final_four_results, final_four_games = simulate_round(final_four_matchups, 4, days=1)
+    final_four_games = simulate_round(final_four_matchups, 4, round_days(4), rng=rng)
     all_games.extend(final_four_games)
     
     # Championship Game - 1 day
-    championship_matchup = create_next_round(final_four_results)
-    championship_result, championship_games = simulate_round(championship_matchup, 5, days=1)
+    championship_matchup = create_next_round(final_four_games)
+    championship_games = simulate_round(championship_matchup, 5, round_days(5), rng=rng)
     all_games.extend(championship_games)
     
     # Tournament Champion
-    champion = championship_result[0]["winner"]
+    champion = championship_games[0].winner
     
     return all_games
 
@@ -197,11 +273,14 @@ def main():
     print("\nSimulation complete!")
     print(f"Total games recorded: {len(tournament_games)}")
     
-    print(tournament_games[0])
+    print(tournament_games[0].to_dict())
 
-    # Convert tournament_games to a DataFrame
-    df = pd.DataFrame(tournament_games)
-    df.to_csv('bracket_results.csv', index=False)
+    # Write tournament_games in the bracket_results.csv layout
+    rows = games_to_dicts(tournament_games)
+    with open('bracket_results.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
 
 
     # num_simulations = 1000
@@ -0,0 +1,173 @@
+import numpy as np
+
+from bracket_pool import DEFAULT_ROUND_POINTS
+from bracket_topology import DEFAULT_TOPOLOGY
+from game_log import games_from_winners, winners_from_columns
+
+WORD_BITS = 64
+
+# Masks for gathering every other bit of a word into its low half
+_COMPRESS_MASKS = [np.uint64(m) for m in (
+    0x3333333333333333, 0x0F0F0F0F0F0F0F0F, 0x00FF00FF00FF00FF,
+    0x0000FFFF0000FFFF, 0x00000000FFFFFFFF,
+)]
+_EVEN_BITS = np.uint64(0x5555555555555555)
+
+if hasattr(np, "bitwise_count"):
+    def popcount(x):
+        """Set bits in each element of a uint64 array."""
+        return np.bitwise_count(x)
+else:
+    _BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(x):
+        """Set bits in each element of a uint64 array."""
+        x = np.ascontiguousarray(x, dtype=np.uint64)
+        return _BYTE_COUNTS[x.view(np.uint8)].reshape(x.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def _check_fits(topology):
+    if topology.num_games > WORD_BITS:
+        raise ValueError(f"{topology.num_games} games do not fit in one {WORD_BITS}-bit code")
+
+
+def _round_masks(topology):
+    """(shift, mask) of each round's bit field."""
+    return [(np.uint64(topology.round_offsets[r]), np.uint64((1 << int(topology.games_per_round[r])) - 1))
+            for r in range(topology.num_rounds)]
+
+
+def encode_winners(winners, topology=DEFAULT_TOPOLOGY):
+    """
+    Pack each tournament of a winners array into one uint64.
+
+    Bit g is set when game g (winners column order) was won by its team2,
+    i.e. the team coming from the higher slot of create_region_matchups /
+    create_next_round's pairing. Given the first-round slots those bits
+    replay the whole bracket, so every outcome has exactly one code and
+    a million tournaments take 8 MB.
+
+    Args:
+        winners: (n, num_games) winners array from simulate_tournaments
+        topology: Field of at most 64 games
+
+    Returns:
+        np.ndarray: (n,) uint64 codes
+    """
+    _check_fits(topology)
+    winners = np.atleast_2d(winners)
+    # A winner's slot position has the side it came from at bit r in round r
+    positions = np.append(topology.positions, 0).astype(np.uint64)
+    game_rounds = np.repeat(np.arange(topology.num_rounds, dtype=np.uint64), topology.games_per_round)
+    sides = (positions[winners] >> game_rounds) & np.uint64(1)
+    weights = np.uint64(1) << np.arange(topology.num_games, dtype=np.uint64)
+    # Bits are disjoint, so summing them is an OR
+    return (sides * weights).sum(axis=1, dtype=np.uint64)
+
+
+def decode_winners(codes, topology=DEFAULT_TOPOLOGY):
+    """
+    Unpack codes from encode_winners into a winners array.
+
+    Returns:
+        np.ndarray: (n, num_games) winners array in the topology's dtype
+    """
+    _check_fits(topology)
+    codes = np.atleast_1d(np.asarray(codes, dtype=np.uint64))
+    winners = np.empty((len(codes), topology.num_games), dtype=topology.dtype)
+    previous = np.broadcast_to(topology.slots, (len(codes), len(topology.slots)))
+    for r, (shift, mask) in enumerate(_round_masks(topology)):
+        games = int(topology.games_per_round[r])
+        field = (codes >> shift) & mask
+        sides = ((field[:, None] >> np.arange(games, dtype=np.uint64)) & np.uint64(1)).astype(bool)
+        cols = topology.round_columns(r)
+        winners[:, cols] = np.where(sides, previous[:, 1::2], previous[:, 0::2])
+        previous = winners[:, cols]
+    return winners
+
+
+def encode_games(columns, topology=DEFAULT_TOPOLOGY):
+    """Codes of the tournaments in bracket_results.csv-style columns (see game_log.winners_from_columns)."""
+    return encode_winners(winners_from_columns(columns, topology), topology)
+
+
+def decode_games(codes, topology=DEFAULT_TOPOLOGY):
+    """bracket_results.csv-style columns of the tournaments in codes (see game_log.games_from_winners)."""
+    return games_from_winners(decode_winners(codes, topology), topology)
+
+
+def bit_differences(a, b):
+    """
+    Number of differing bits between codes, broadcasting a against b.
+
+    A cheap distance between brackets: it counts games whose winner came
+    from a different side, whether or not the teams on those sides agree.
+    Use round_agreement to count identical picks.
+    """
+    return popcount(np.bitwise_xor(np.asarray(a, dtype=np.uint64), np.asarray(b, dtype=np.uint64)))
+
+
+def _compress(x):
+    """Gather bits 0, 2, 4, ... of each word into its low half."""
+    x = x & _EVEN_BITS
+    for shift, mask in enumerate(_COMPRESS_MASKS):
+        x = (x | (x >> np.uint64(1 << shift))) & mask
+    return x
+
+
+def round_agreement(a, b, topology=DEFAULT_TOPOLOGY):
+    """
+    Games per round on which two sets of codes pick the same winner.
+
+    Two brackets share game g's winner when they agree on the side it came
+    from and on the winner of the game feeding that side, so each round's
+    agreement mask is the side-agreement bits ANDed with the previous
+    round's mask, gathered to the chosen side. Everything is word-wide
+    bit operations on the codes, with no unpacking.
+
+    Args:
+        a, b: uint64 codes, broadcast against each other (e.g. (B, 1)
+            against (N,) gives every pair)
+        topology: Field the codes were encoded with
+
+    Returns:
+        np.ndarray: broadcast shape + (num_rounds,) uint8 counts
+    """
+    _check_fits(topology)
+    a = np.asarray(a, dtype=np.uint64)
+    b = np.asarray(b, dtype=np.uint64)
+    same_side = ~(a ^ b)
+    counts = []
+    same = None
+    for shift, mask in _round_masks(topology):
+        side = (a >> shift) & mask
+        agree = (same_side >> shift) & mask
+        if same is not None:
+            # Feeding game 2k is the team1 side of game k, 2k + 1 the team2 side
+            agree &= (side & _compress(same >> np.uint64(1))) | (~side & _compress(same))
+        same = agree
+        counts.append(popcount(same))
+    return np.stack(counts, axis=-1)
+
+
+def agreement(a, b, topology=DEFAULT_TOPOLOGY):
+    """Total games on which a and b pick the same winner (see round_agreement)."""
+    return round_agreement(a, b, topology).sum(axis=-1, dtype=np.int64)
+
+
+def score_codes(picks, outcomes, round_points=None, topology=DEFAULT_TOPOLOGY):
+    """
+    Pool score of packed picks against packed outcomes.
+
+    Args:
+        picks, outcomes: uint64 codes, broadcast against each other
+        round_points: Points per correct pick in each round (defaults to
+            bracket_pool.DEFAULT_ROUND_POINTS)
+
+    Returns:
+        np.ndarray: Scores in the broadcast shape
+    """
+    if round_points is None:
+        round_points = np.zeros(topology.num_rounds)
+        round_points[-len(DEFAULT_ROUND_POINTS):] = DEFAULT_ROUND_POINTS
+    return round_agreement(picks, outcomes, topology) @ np.asarray(round_points, dtype=float)
@@ -0,0 +1,189 @@
+import numpy as np
+
+from batch_simulation import locks_from_games, resolve_locks, simulate_tournaments
+from bracket_topology import DEFAULT_TOPOLOGY
+from calculate_odds import make_rng
+from game_log import fill_byes
+from schedule import get_schedule
+
+# ESPN-style scoring: points double every round
+DEFAULT_ROUND_POINTS = (10, 20, 40, 80, 160, 320)
+DEFAULT_MEMORY_LIMIT = 512 * 2**20
+
+
+def picks_from_games(games, topology=DEFAULT_TOPOLOGY):
+    """
+    One bracket's picks from a list of games (GameRecords or dicts, as
+    from simulate_tournament or a filled-in bracket_results.csv).
+
+    Returns:
+        np.ndarray: (num_games,) picked winner per game in winners column
+        order; games decided by a bye hold the advancing team
+    """
+    fixed = resolve_locks(locks_from_games(games, topology), topology)
+    played = get_schedule(topology).game_days > 0
+    if (fixed[played] < 0).any():
+        raise ValueError("Bracket does not pick every game")
+    picks = np.maximum(fixed, 0).astype(topology.dtype)[None]
+    return fill_byes(picks, topology)[0]
+
+
+def pick_values(picks, round_points=None, seed_bonus=None, topology=DEFAULT_TOPOLOGY):
+    """
+    Points each pick is worth if it comes true.
+
+    Args:
+        picks: (B, num_games) picked winners in winners column order
+        round_points: Points per correct pick in each round (defaults to
+            DEFAULT_ROUND_POINTS for the last six rounds, 0 before that)
+        seed_bonus: Extra points for a correct pick by the winner's seed,
+            broadcastable to (num_rounds, max_seed); e.g. np.arange(1, 17)
+            adds the winner's seed in every round
+        topology: Field the picks refer to
+
+    Returns:
+        np.ndarray: (B, num_games) float32 values
+    """
+    picks = np.atleast_2d(picks)
+    if round_points is None:
+        round_points = np.zeros(topology.num_rounds)
+        round_points[-len(DEFAULT_ROUND_POINTS):] = DEFAULT_ROUND_POINTS
+    round_points = np.asarray(round_points, dtype=np.float32)
+    if len(round_points) != topology.num_rounds:
+        raise ValueError(f"round_points needs {topology.num_rounds} entries")
+
+    game_rounds = np.repeat(np.arange(topology.num_rounds), topology.games_per_round)
+    values = np.broadcast_to(round_points[game_rounds], picks.shape).astype(np.float32)
+    if seed_bonus is not None:
+        max_seed = int(topology.seeds.max())
+        bonus = np.broadcast_to(np.asarray(seed_bonus, dtype=np.float32), (topology.num_rounds, max_seed))
+        seeds = np.append(topology.seeds, 1).astype(np.intp)[picks]
+        values = values + bonus[game_rounds, seeds - 1]
+    return values
+
+
+def _indicator_columns(winners, topology):
+    """
+    Column of every (game, winner) in the indicator encoding.
+
+    A team's slot position identifies both the game it plays in each round
+    and which of that game's candidates it is, so round r's games map onto
+    columns r * num_slots + position. Byes go to one extra, always-empty
+    column.
+    """
+    num_slots = len(topology.slots)
+    positions = np.append(topology.positions, -1)
+    game_rounds = np.repeat(np.arange(topology.num_rounds), topology.games_per_round)
+    winner_positions = positions[winners]
+    return np.where(winner_positions >= 0, game_rounds * num_slots + winner_positions,
+                    topology.num_rounds * num_slots)
+
+
+def encode_picks(picks, values, topology=DEFAULT_TOPOLOGY):
+    """(B, K) float32 matrix holding each pick's value at its indicator column."""
+    picks = np.atleast_2d(picks)
+    width = topology.num_rounds * len(topology.slots) + 1
+    encoded = np.zeros((len(picks), width), dtype=np.float32)
+    columns = _indicator_columns(picks, topology)
+    np.put_along_axis(encoded, columns, values, axis=1)
+    encoded[:, -1] = 0
+    return encoded
+
+
+def encode_outcomes(winners, topology=DEFAULT_TOPOLOGY):
+    """(N, K) float32 0/1 matrix of which (game, winner) indicators happened."""
+    winners = np.atleast_2d(winners)
+    width = topology.num_rounds * len(topology.slots) + 1
+    encoded = np.zeros((len(winners), width), dtype=np.float32)
+    np.put_along_axis(encoded, _indicator_columns(winners, topology), 1.0, axis=1)
+    return encoded
+
+
+def score_brackets(picks, outcomes, round_points=None, seed_bonus=None, topology=DEFAULT_TOPOLOGY):
+    """
+    Score every bracket against every simulated outcome.
+
+    Score = sum over games of the pick's value where the pick matches the
+    outcome, computed as one matrix product of the encoded picks and
+    outcomes. Use pool_standings for large B x N, which never holds the
+    full matrix.
+
+    Args:
+        picks: (B, num_games) picked winners
+        outcomes: (N, num_games) winners arrays from simulate_tournaments
+
+    Returns:
+        np.ndarray: (B, N) float32 scores
+    """
+    values = pick_values(picks, round_points, seed_bonus, topology)
+    return encode_picks(picks, values, topology) @ encode_outcomes(outcomes, topology).T
+
+
+def _outcome_bytes(num_brackets, topology, itemsize):
+    """
+    Approximate peak bytes each outcome adds to a pool_standings chunk:
+    its score column and that column's float64 square (the tie mask and
+    shares are smaller), its winners row with the intp temporaries of
+    _indicator_columns, and its float32 encode_outcomes row.
+    """
+    width = topology.num_rounds * len(topology.slots) + 1
+    index_bytes = np.dtype(np.intp).itemsize
+    return num_brackets * (4 + 8) + topology.num_games * (itemsize + 4 * index_bytes) + width * 4
+
+
+def pool_standings(picks, outcomes, round_points=None, seed_bonus=None, topology=DEFAULT_TOPOLOGY,
+                   memory_limit=DEFAULT_MEMORY_LIMIT, rng=None):
+    """
+    Expected score and pool-win probability of every bracket.
+
+    Outcomes are processed in chunks sized so the (B, chunk) score block,
+    the chunk's winners and encoded outcomes and their temporaries stay
+    within memory_limit bytes; each chunk is one float32 matrix product
+    followed by per-simulation reductions.
+
+    Args:
+        picks: (B, num_games) picked winners
+        outcomes: (N, num_games) winners array (a memmap works), or an int
+            N to simulate that many tournaments on the fly
+        round_points, seed_bonus: Scoring rules, see pick_values
+        memory_limit: Approximate peak bytes for a chunk's working arrays
+        rng: np.random.Generator or seed when outcomes is a count
+
+    Returns:
+        dict: 'expected_score', 'score_std' and 'win_probability' (ties
+        split evenly between the tied brackets), each (B,), plus
+        'num_simulations'
+    """
+    picks = np.atleast_2d(picks)
+    num_brackets = len(picks)
+    encoded_picks = encode_picks(picks, pick_values(picks, round_points, seed_bonus, topology), topology)
+
+    simulate = isinstance(outcomes, (int, np.integer))
+    itemsize = np.dtype(topology.dtype if simulate else getattr(outcomes, "dtype", np.intp)).itemsize
+    chunk = max(1, int(memory_limit // _outcome_bytes(num_brackets, topology, itemsize)))
+    num_simulations = int(outcomes) if simulate else len(outcomes)
+    rng = make_rng(rng)
+
+    total = np.zeros(num_brackets)
+    squares = np.zeros(num_brackets)
+    wins = np.zeros(num_brackets)
+    for start in range(0, num_simulations, chunk):
+        stop = min(start + chunk, num_simulations)
+        if simulate:
+            block = simulate_tournaments(stop - start, rng, topology=topology)
+        else:
+            block = np.asarray(outcomes[start:stop])
+        scores = encoded_picks @ encode_outcomes(block, topology).T
+        total += scores.sum(axis=1)
+        squares += np.square(scores, dtype=np.float64).sum(axis=1)
+        tied = scores == scores.max(axis=0)
+        wins += (tied / tied.sum(axis=0, dtype=np.float32)).sum(axis=1)
+
+    n = max(num_simulations, 1)
+    mean = total / n
+    return {
+        "expected_score": mean,
+        "score_std": np.sqrt(np.maximum(squares / n - mean * mean, 0)),
+        "win_probability": wins / n,
+        "num_simulations": num_simulations,
+    }
@@ -0,0 +1,188 @@
+import numpy as np
+
+from calculate_odds import NUM_ROUNDS, NUM_SEEDS
+from bracket import create_tournament, create_region_matchups
+
+# NCAA First Four: two 16-seed and two 11-seed play-in games
+FIRST_FOUR_SEEDS = (16, 16, 11, 11)
+
+
+class BracketTopology:
+    """
+    Shape of a single-elimination field, independent of any results.
+
+    The field is a complete binary tree over a power-of-two number of
+    slots: slots 2k and 2k+1 meet and the winner moves to slot k of the
+    next round. Slots that hold no team are byes, stored as the sentinel
+    team index `bye` (== num_teams); a team facing a bye advances without
+    a game being drawn. Play-in games are just an extra round in which
+    most teams have a bye.
+
+    Attributes:
+        slots: Initial team index per slot, with `bye` for empty slots
+        seeds: Seed of each team, indexed by team index
+        names: Team name of each team, indexed by team index
+        num_teams, num_rounds, games_per_round, round_offsets, num_games:
+            Sizes; round r's games are columns round_offsets[r] up to
+            round_offsets[r + 1] of a winners array
+        odds_rounds: Odds-table round used for each round. The last six
+            rounds use rounds 0-5; earlier rounds (play-ins, opening rounds
+            of larger fields) use round 0
+        odds_seed_index: Odds-table seed index (seed - 1, clipped to the
+            table's 16 seeds) per team index, with an entry for the bye
+        positions: Initial slot of each team index
+        dtype: Smallest unsigned dtype that holds every team index and bye
+    """
+
+    def __init__(self, slots, seeds, names=None):
+        seeds = np.asarray(seeds, dtype=np.int16)
+        slots = np.asarray(slots, dtype=np.int64)
+        num_slots = len(slots)
+        if num_slots < 2 or num_slots & (num_slots - 1):
+            raise ValueError(f"Slot count must be a power of two, got {num_slots}")
+
+        self.num_teams = len(seeds)
+        self.bye = self.num_teams
+        self.dtype = np.uint8 if self.num_teams < 255 else np.uint16
+        self.slots = slots.astype(self.dtype)
+        self.seeds = seeds
+        self.names = names if names is not None else [str(i + 1) for i in range(self.num_teams)]
+
+        occupied = slots != self.bye
+        if sorted(slots[occupied].tolist()) != list(range(self.num_teams)):
+            raise ValueError("Every team must occupy exactly one slot")
+        self.has_byes = not occupied.all()
+        self.positions = np.empty(self.num_teams, dtype=np.intp)
+        self.positions[slots[occupied]] = np.flatnonzero(occupied)
+
+        self.num_rounds = num_slots.bit_length() - 1
+        self.games_per_round = [num_slots >> (r + 1) for r in range(self.num_rounds)]
+        self.round_offsets = np.concatenate(([0], np.cumsum(self.games_per_round))).astype(int).tolist()
+        self.num_games = self.round_offsets[-1]
+
+        self.odds_rounds = np.clip(np.arange(self.num_rounds) - (self.num_rounds - NUM_ROUNDS), 0, NUM_ROUNDS - 1)
+        self.odds_seed_index = np.minimum(np.append(seeds, 1), NUM_SEEDS).astype(np.intp) - 1
+
+    def round_columns(self, r):
+        """Slice of round r's games in a winners array."""
+        return slice(self.round_offsets[r], self.round_offsets[r + 1])
+
+    def __repr__(self):
+        return f"BracketTopology(teams={self.num_teams}, rounds={self.num_rounds})"
+
+
+def standard_seed_order(size):
+    """
+    Seeds of a `size`-slot region in bracket slot order.
+
+    A 16-slot region uses the pairing list from create_region_matchups;
+    other sizes follow the usual rule that the seeds in each game sum to
+    size + 1, nested the same way.
+    """
+    if size == NUM_SEEDS:
+        teams = [{"region": None, "seed": seed, "name": str(seed)} for seed in range(1, NUM_SEEDS + 1)]
+        order = []
+        for matchup in create_region_matchups(teams):
+            order.extend((matchup["team1"]["seed"], matchup["team2"]["seed"]))
+        return order
+    if size == 1:
+        return [1]
+    order = []
+    for seed in standard_seed_order(size // 2):
+        order.extend((seed, size + 1 - seed))
+    return order
+
+
+def topology_from_teams(teams=None):
+    """
+    Topology of the 64-team field from create_tournament.
+
+    Team index is int(team["name"]) - 1 and slots follow the order
+    create_region_matchups and create_next_round pair teams in.
+    """
+    if teams is None:
+        teams = create_tournament()
+
+    regions = {}
+    for team in teams:
+        regions.setdefault(team["region"], []).append(team)
+
+    slots = []
+    for region_teams in regions.values():
+        for matchup in create_region_matchups(region_teams):
+            slots.append(int(matchup["team1"]["name"]) - 1)
+            slots.append(int(matchup["team2"]["name"]) - 1)
+
+    seeds = np.zeros(len(teams), dtype=np.int16)
+    names = [None] * len(teams)
+    for team in teams:
+        seeds[int(team["name"]) - 1] = team["seed"]
+        names[int(team["name"]) - 1] = team["name"]
+
+    return BracketTopology(slots, seeds, names)
+
+
+def build_topology(field_size=64, num_regions=4, play_in_seeds=None):
+    """
+    Build a field from a size spec.
+
+    Each region gets field_size / num_regions seeded teams (play-in teams
+    excluded), laid out in a power-of-two region bracket; missing seeds
+    become byes for the top seeds. Every entry in play_in_seeds adds one
+    team that must first beat the team on that seed line; play-in i goes
+    to region i % num_regions.
+
+    Examples:
+        build_topology(64)    the standard field (same as create_tournament)
+        build_topology(68)    64 + First Four (two 16 and two 11 lines)
+        build_topology(96)    24 seeds per region, seeds 1-8 get byes
+        build_topology(128)   32 seeds per region
+
+    Team indices run region by region, seed by seed, with play-in teams
+    after all seeded teams, so a 68-team field keeps the 64-team indices.
+    Seeds above 16 share the 16-seed odds (see BracketTopology).
+    """
+    if play_in_seeds is None:
+        play_in_seeds = FIRST_FOUR_SEEDS if field_size == 68 else ()
+    main_size = field_size - len(play_in_seeds)
+    if main_size % num_regions:
+        raise ValueError(f"{main_size} teams cannot be split into {num_regions} regions")
+    per_region = main_size // num_regions
+
+    if per_region == NUM_SEEDS and num_regions == 4 and not play_in_seeds:
+        return topology_from_teams()
+
+    region_size = 1 << (per_region - 1).bit_length()
+    seed_order = standard_seed_order(region_size)
+
+    seeds = [seed for _ in range(num_regions) for seed in range(1, per_region + 1)]
+    names = [str(i + 1) for i in range(main_size)]
+    num_teams = field_size
+    bye = num_teams
+
+    play_ins = {}
+    for i, seed in enumerate(play_in_seeds):
+        if not 1 <= seed <= per_region:
+            raise ValueError(f"Play-in seed {seed} is not in the field")
+        region = i % num_regions
+        team = main_size + i
+        play_ins.setdefault((region, seed), []).append(team)
+        seeds.append(seed)
+        names.append(f"{region * per_region + seed}b")
+    if any(len(teams) > 1 for teams in play_ins.values()):
+        raise ValueError("Only one play-in game per seed line and region")
+
+    slots = []
+    for region in range(num_regions):
+        for seed in seed_order:
+            team = region * per_region + seed - 1 if seed <= per_region else bye
+            if play_in_seeds:
+                # Every slot becomes a play-in pair, mostly (team, bye)
+                slots.extend((team, play_ins.get((region, seed), [bye])[0]))
+            else:
+                slots.append(team)
+
+    return BracketTopology(slots, seeds, names)
+
+
+DEFAULT_TOPOLOGY = topology_from_teams()
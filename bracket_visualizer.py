@@ -1,4 +1,5 @@
-from bracket import simulate_tournament
+from bracket import simulate_tournament, games_to_dicts
+from advancement import ROUND_NAMES, load_advancement, read_advancement
 import json
 import os
 import random
@@ -133,10 +134,42 @@ def format_team_name(team, team_name_mapping):
     real_name = team_name_mapping.get(team['name'], team['name'])
     return f"{team['seed']} {real_name}"
 
-def generate_bracket_html(tournament_games):
-    """Generate HTML bracket visualization from tournament games"""
+def advancement_table_html(advancement, games, team_name_mapping, top=16):
+    """HTML table of the teams with the best title odds, one column per round"""
+    seeds = {}
+    for game in games:
+        seeds[int(game["team1"])] = game["seed_team1"]
+        seeds[int(game["team2"])] = game["seed_team2"]
+
+    order = sorted(range(len(advancement)), key=lambda t: -advancement[t][-1])[:top]
+    header = "".join(f"<th>{name}</th>" for name in ROUND_NAMES)
+    rows = []
+    for team in order:
+        team_id = team + 1
+        label = format_team_name({"seed": seeds.get(team_id, ""), "name": str(team_id)}, team_name_mapping)
+        cells = "".join(f"<td>{p:.1%}</td>" for p in advancement[team])
+        rows.append(f"<tr><td class=\"team-name\">{label}</td>{cells}</tr>")
+    return f"""
+  <h2>Advancement Odds</h2>
+  <table class="advancement">
+    <tr><th>Team</th>{header}</tr>
+    {"".join(rows)}
+  </table>"""
+
+def generate_bracket_html(tournament_games, advancement=None):
+    """
+    Generate HTML bracket visualization from tournament games
+
+    advancement: Optional (64, 6) advancement matrix (or the path of a
+    cached one, see advancement.load_advancement); adds a table of each
+    team's odds of reaching every round
+    """
     # Assign realistic team names
     team_name_mapping = assign_team_names([str(i) for i in range(1, 65)])
+    advancement_html = ""
+    if advancement is not None:
+        advancement_html = advancement_table_html(read_advancement(advancement), tournament_games,
+                                                  team_name_mapping)
     
     # Group games by round
     rounds = {}
@@ -323,6 +356,26 @@ def generate_bracket_html(tournament_games):
       font-size: 1.2em;
     }}
     
+    table.advancement {{
+      margin: 0 auto 30px;
+      border-collapse: collapse;
+      background-color: white;
+    }}
+    
+    table.advancement th, table.advancement td {{
+      padding: 6px 12px;
+      border-bottom: 1px solid #ddd;
+    }}
+    
+    table.advancement th {{
+      color: #0a4b78;
+    }}
+    
+    table.advancement td.team-name {{
+      text-align: left;
+      font-weight: bold;
+    }}
+    
     /* Team-specific colors */
     {team_color_css}
   </style>
@@ -350,6 +403,7 @@ def generate_bracket_html(tournament_games):
   <div class="bracket-container">
     <div id="tournament"></div>
   </div>
+  {advancement_html}
   
   <script>
     $(document).ready(function() {{
@@ -416,10 +470,10 @@ def generate_bracket_html(tournament_games):
 def main():
     # Run the simulation
     print("Running NCAA Tournament simulation...")
-    tournament_games = simulate_tournament()
+    tournament_games = games_to_dicts(simulate_tournament())
     
     # Generate bracket visualization and get champion
-    champion = generate_bracket_html(tournament_games)
+    champion = generate_bracket_html(tournament_games, load_advancement())
     
     print(f"Tournament Champion: {champion}")
     print("Open tournament_bracket.html in your browser to view the bracket!")
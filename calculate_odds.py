@@ -1,7 +1,28 @@
+import array
+import csv
+import hashlib
+import math
+import os
 import random
-import pandas as pd
+import struct
 
-winrate_df = pd.read_csv("winrates.csv")
+# numpy and pandas are only imported by the functions that return arrays or
+# DataFrames, so importing this module (and the scalar simulator in
+# bracket.py) stays cheap. The winrate data itself is loaded on first use.
+
+NUM_ROUNDS = 6
+NUM_SEEDS = 16
+
+WINRATES_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "winrates.csv")
+WINRATES_CACHE = WINRATES_CSV + ".cache"
+
+# Cache layout: header (magic, csv size, csv mtime_ns, csv sha256) followed
+# by the winrate, win and loss tables as little-endian float64, each
+# NUM_ROUNDS * NUM_SEEDS cells in (round, seed) order
+_CACHE_MAGIC = b"WRCACHE1"
+_CACHE_HEADER = struct.Struct("<8sqq32s")
+_CACHE_COLUMNS = ("winrate", "win", "loss")
+_NUM_CELLS = NUM_ROUNDS * NUM_SEEDS
 
 # winrate_dict = {
 #     1: 0.797213622,
@@ -22,23 +43,261 @@ winrate_df = pd.read_csv("winrates.csv")
 #     16: 0.012658228
 # }
 
+_tables = None
+_odds = None
+_arrays = {}
+
+def _parse_winrates_csv(data):
+    tables = {name: array.array('d', [math.nan]) * _NUM_CELLS for name in _CACHE_COLUMNS}
+    for row in csv.DictReader(data.decode("utf-8-sig").splitlines()):
+        round, seed = int(row['round']), int(row['seed'])
+        if 0 <= round < NUM_ROUNDS and 1 <= seed <= NUM_SEEDS:
+            for name in _CACHE_COLUMNS:
+                tables[name][round * NUM_SEEDS + seed - 1] = float(row[name])
+    return tables
+
+def _read_cache(cache_path, stat, csv_path):
+    try:
+        with open(cache_path, "rb") as f:
+            blob = f.read()
+    except OSError:
+        return None
+
+    body_size = len(_CACHE_COLUMNS) * _NUM_CELLS * 8
+    if len(blob) != _CACHE_HEADER.size + body_size:
+        return None
+    magic, size, mtime_ns, digest = _CACHE_HEADER.unpack_from(blob)
+    if magic != _CACHE_MAGIC:
+        return None
+
+    if (size, mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+        # Touched but possibly unchanged: fall back to comparing contents
+        with open(csv_path, "rb") as f:
+            if hashlib.sha256(f.read()).digest() != digest:
+                return None
+
+    values = array.array('d')
+    values.frombytes(blob[_CACHE_HEADER.size:])
+    if struct.pack("=d", 1.0) != struct.pack("<d", 1.0):
+        values.byteswap()
+    if any(v < 0 for v in values):
+        return None
+    return {
+        name: values[i * _NUM_CELLS:(i + 1) * _NUM_CELLS]
+        for i, name in enumerate(_CACHE_COLUMNS)
+    }
+
+def write_cache_file(path, write):
+    """
+    Atomically (re)write a cache file.
+
+    write(f) fills a temporary file next to path, which then replaces path,
+    so concurrent readers never see a partial file. Failing to write is not
+    an error: a read-only checkout just means no cache.
+
+    Returns:
+        bool: Whether the cache file was written
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+    return True
+
+def _write_cache(cache_path, stat, digest, tables):
+    values = array.array('d')
+    for name in _CACHE_COLUMNS:
+        values.extend(tables[name])
+    if struct.pack("=d", 1.0) != struct.pack("<d", 1.0):
+        values.byteswap()
+    header = _CACHE_HEADER.pack(_CACHE_MAGIC, stat.st_size, stat.st_mtime_ns, digest)
+    write_cache_file(cache_path, lambda f: f.write(header + values.tobytes()))
+
+def load_winrates(csv_path=WINRATES_CSV, cache_path=None, use_cache=True):
+    """
+    Load the per-(round, seed) winrate, win and loss tables.
+
+    The parsed CSV is persisted to a binary cache next to it. The cache is
+    used while the CSV's size and mtime match the ones recorded in it, or,
+    if those changed, while its SHA-256 still matches; otherwise the CSV is
+    reparsed and the cache rewritten.
+
+    Returns:
+        dict: 'winrate', 'win' and 'loss' flat array('d') tables of
+        NUM_ROUNDS * NUM_SEEDS cells; cell (r, s) is at r * NUM_SEEDS + s - 1
+        and cells missing from the CSV are NaN
+    """
+    if cache_path is None:
+        cache_path = csv_path + ".cache"
+    stat = os.stat(csv_path)
+
+    if use_cache:
+        tables = _read_cache(cache_path, stat, csv_path)
+        if tables is not None:
+            return tables
+
+    with open(csv_path, "rb") as f:
+        data = f.read()
+    tables = _parse_winrates_csv(data)
+    if use_cache:
+        _write_cache(cache_path, stat, hashlib.sha256(data).digest(), tables)
+    return tables
+
+def _get_tables():
+    global _tables
+    if _tables is None:
+        _tables = load_winrates()
+    return _tables
+
+def _get_flat_odds():
+    global _odds
+    if _odds is None:
+        winrates = _get_tables()['winrate']
+        odds = []
+        for r in range(NUM_ROUNDS):
+            row = winrates[r * NUM_SEEDS:(r + 1) * NUM_SEEDS]
+            for winrate1 in row:
+                odds.extend(winrate1 / (winrate1 + winrate2) for winrate2 in row)
+        _odds = odds
+    return _odds
+
+def reload_winrates():
+    """Drop the loaded tables so the next lookup rereads winrates.csv."""
+    global _tables, _odds
+    _tables = None
+    _odds = None
+    _arrays.clear()
+
+def get_winrate_table():
+    """Dense (round, seed) winrate array; seed s is at column s - 1."""
+    if 'winrate' not in _arrays:
+        import numpy as np
+        _arrays['winrate'] = np.array(_get_tables()['winrate']).reshape(NUM_ROUNDS, NUM_SEEDS)
+    return _arrays['winrate']
+
+def build_odds_table(winrates):
+    """
+    Build the dense (round, seed_a, seed_b) table of P(seed_a beats seed_b).
+
+    Uses the same winrate1 / (winrate1 + winrate2) ratio as get_odds, so
+    odds_table[r, a - 1, b - 1] == get_odds(a, b, r).
+    """
+    return winrates[:, :, None] / (winrates[:, :, None] + winrates[:, None, :])
+
+def get_odds_table():
+    """Dense (6, 16, 16) array of P(seed_a beats seed_b in round r)."""
+    if 'odds' not in _arrays:
+        _arrays['odds'] = build_odds_table(get_winrate_table())
+    return _arrays['odds']
+
+def __getattr__(name):
+    # Lazy module attributes kept for existing callers
+    if name == 'winrate_table':
+        return get_winrate_table()
+    if name == 'odds_table':
+        return get_odds_table()
+    if name == 'winrate_df':
+        if 'df' not in _arrays:
+            import pandas as pd
+            _arrays['df'] = pd.read_csv(WINRATES_CSV)
+        return _arrays['df']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 def get_winrate(seed, round):
     try:
-        winrate = winrate_df[(winrate_df['seed'] == seed) & (winrate_df['round'] == round)].iloc[0]['winrate']
-        return winrate
-    except:
+        if not (1 <= seed <= NUM_SEEDS and 0 <= round < NUM_ROUNDS):
+            return None
+        winrate = _get_tables()['winrate'][round * NUM_SEEDS + seed - 1]
+    except TypeError:
         return None
+    return None if math.isnan(winrate) else winrate
 
 def get_odds(seed1, seed2, round):
-    winrate1 = get_winrate(seed1, round)
-    winrate2 = get_winrate(seed2, round)
-    
-    if winrate1 is None or winrate2 is None:
+    try:
+        if not (1 <= seed1 <= NUM_SEEDS and 1 <= seed2 <= NUM_SEEDS and 0 <= round < NUM_ROUNDS):
+            raise ValueError("Invalid seed value")
+        odds = _get_flat_odds()[(round * NUM_SEEDS + seed1 - 1) * NUM_SEEDS + seed2 - 1]
+    except TypeError:
+        raise ValueError("Invalid seed value")
+
+    if math.isnan(odds):
         raise ValueError("Invalid seed value")
-    
-    odds = winrate1 / (winrate1 + winrate2)
+
     return odds
 
-def get_win(seed1, seed2, round):
+def make_rng(seed=None):
+    """
+    Normalize a seed into an np.random.Generator.
+
+    Accepts None (fresh entropy), an int, a SeedSequence or an existing
+    Generator, which is returned unchanged.
+    """
+    import numpy as np
+    return np.random.default_rng(seed)
+
+def spawn_rngs(seed, count):
+    """
+    Create `count` statistically independent generators from one seed.
+
+    The streams come from SeedSequence.spawn, so the same (seed, count)
+    always yields the same streams, e.g. one per worker process.
+    """
+    import numpy as np
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [np.random.default_rng(child) for child in seed.spawn(count)]
+
+def get_win(seed1, seed2, round, rng=None):
+    """
+    Pick the winning seed of one game.
+
+    rng may be an np.random.Generator or random.Random; the global random
+    module is used when it is None.
+    """
+    if rng is None:
+        rng = random
     odds = get_odds(seed1, seed2, round)
-    return seed1 if random.random() < odds else seed2
+    return seed1 if rng.random() < odds else seed2
+
+def get_odds_batch(seeds1, seeds2, rounds):
+    """
+    Vectorized get_odds.
+
+    Args:
+        seeds1: Array of seeds (1-16) for the first team in each game
+        seeds2: Array of seeds (1-16) for the second team in each game
+        rounds: Array of tournament rounds (0-5), broadcast against the seeds
+
+    Returns:
+        np.ndarray: P(seeds1 beats seeds2) for each game, in the broadcast shape
+    """
+    import numpy as np
+    seeds1 = np.asarray(seeds1, dtype=np.intp)
+    seeds2 = np.asarray(seeds2, dtype=np.intp)
+    rounds = np.asarray(rounds, dtype=np.intp)
+
+    if (seeds1.size and (seeds1.min() < 1 or seeds1.max() > NUM_SEEDS)) or \
+       (seeds2.size and (seeds2.min() < 1 or seeds2.max() > NUM_SEEDS)) or \
+       (rounds.size and (rounds.min() < 0 or rounds.max() >= NUM_ROUNDS)):
+        raise ValueError("Invalid seed value")
+
+    odds = get_odds_table()[rounds, seeds1 - 1, seeds2 - 1]
+    if np.isnan(odds).any():
+        raise ValueError("Invalid seed value")
+    return odds
+
+def get_win_batch(seeds1, seeds2, rounds, rng=None):
+    """
+    Vectorized get_win: returns a boolean array that is True where the
+    first seed wins.
+    """
+    odds = get_odds_batch(seeds1, seeds2, rounds)
+    return make_rng(rng).random(odds.shape) < odds
@@ -1,4 +1,4 @@
-from bracket import simulate_tournament
+from bracket import simulate_tournament, games_to_dicts
 import json
 import os
 import random
@@ -582,7 +582,7 @@ def generate_bracket_html(tournament_games):
 def main():
     # Run the simulation
     print("Running NCAA Tournament simulation...")
-    tournament_games = simulate_tournament()
+    tournament_games = games_to_dicts(simulate_tournament())
     
     # Generate bracket visualization and get champion
     champion = generate_bracket_html(tournament_games)
@@ -0,0 +1,107 @@
+import numpy as np
+
+from batch_simulation import resolve_locks
+from bracket_topology import DEFAULT_TOPOLOGY, BracketTopology
+from probability_models import resolve_odds
+
+
+def advancement_probabilities(slots=None, seeds=None, odds=None, locked=None, topology=None):
+    """
+    Exact P(team wins its game in round r) for every team and round.
+
+    The bracket is a fixed binary tree (slots 2k and 2k+1 meet, winner
+    moves to slot k), so the distribution of who wins each game only
+    depends on the distributions of its two feeder games. Walking the tree
+    bottom-up once gives every advancement probability with no sampling.
+
+    Args:
+        slots: (64,) team indices in bracket slot order (defaults to
+            the topology's slots)
+        seeds: Seeds indexed by team index (defaults to the topology's seeds)
+        odds: (6, 16, 16) table of P(seed_a beats seed_b) per round or a
+            probability_models.ProbabilityModel for the field's teams
+            (defaults to calculate_odds.get_odds_table())
+        locked: Known results as for batch_simulation.simulate_tournaments;
+            locked games are certain and everything downstream is
+            conditioned on them
+        topology: bracket_topology.BracketTopology of the field (the
+            standard 64-team field by default); slots and seeds override it
+
+    Returns:
+        np.ndarray: (64, 6) float array indexed by team index (or
+        (num_teams, num_rounds) for other topologies); column r is
+        P(team wins its round-r game), so the last column is P(champion).
+    """
+    if topology is None:
+        topology = DEFAULT_TOPOLOGY
+    if slots is not None or seeds is not None:
+        topology = BracketTopology(
+            topology.slots if slots is None else slots,
+            topology.seeds if seeds is None else seeds,
+        )
+    odds, index = resolve_odds(odds, topology)
+
+    slots = topology.slots.astype(np.intp)
+    odds_idx = index[slots]
+    num_slots = len(slots)
+    fixed = None
+    if locked is not None:
+        fixed = resolve_locks(locked, topology) if isinstance(locked, dict) else np.asarray(locked)
+
+    # Row k holds P(team in slot position k is still alive), slot order;
+    # byes are never alive
+    alive = (slots != topology.bye).astype(float)
+    advancement = np.zeros((num_slots, topology.num_rounds))
+
+    for r in range(topology.num_rounds):
+        size = 1 << r  # teams per feeder subtree
+        games = num_slots // (2 * size)
+        block = alive.reshape(games, 2, size)
+        block_idx = odds_idx.reshape(games, 2, size)
+
+        # win[g, i, j] = P(left team i beats right team j) in game g
+        win = odds[topology.odds_rounds[r]][block_idx[:, 0, :, None], block_idx[:, 1, None, :]]
+        left = block[:, 0] * np.einsum('gij,gj->gi', win, block[:, 1])
+        right = block[:, 1] * np.einsum('gij,gi->gj', 1 - win, block[:, 0])
+        if topology.has_byes:
+            # Whatever probability a side has no team left is a bye for the other
+            left += block[:, 0] * (1 - block[:, 1].sum(axis=1, keepdims=True))
+            right += block[:, 1] * (1 - block[:, 0].sum(axis=1, keepdims=True))
+
+        alive = np.stack((left, right), axis=1).reshape(num_slots)
+
+        if fixed is not None:
+            offset = topology.round_offsets[r]
+            for game in np.flatnonzero(fixed[topology.round_columns(r)] >= 0):
+                winner = fixed[offset + game]
+                alive[game * 2 * size:(game + 1) * 2 * size] = 0
+                alive[topology.positions[winner]] = 1
+        advancement[:, r] = alive
+
+    # Reorder rows from slot order to team index, dropping byes
+    result = np.zeros((topology.num_teams + 1, topology.num_rounds))
+    result[slots] = advancement
+    return result[:topology.num_teams]
+
+
+def sampling_z_scores(aggregates, advancement=None):
+    """
+    Compare simulated advancement counts against the exact solution.
+
+    Args:
+        aggregates: parallel_simulation.SimulationAggregates
+        advancement: Exact (64, 6) matrix (computed for the aggregates'
+            topology if None)
+
+    Returns:
+        np.ndarray: (64, 6) z-scores of the simulated frequencies; values
+        well beyond +/-4 point at a bug in the simulator or the solver.
+    """
+    if advancement is None:
+        advancement = advancement_probabilities(topology=aggregates.topology)
+    n = aggregates.num_tournaments
+    observed = aggregates.wins / n
+    std = np.sqrt(advancement * (1 - advancement) / n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(std > 0, (observed - advancement) / std, 0.0)
+    return z
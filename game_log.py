@@ -0,0 +1,277 @@
+import functools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from calculate_odds import make_rng
+from batch_simulation import simulate_tournaments
+from bracket_topology import DEFAULT_TOPOLOGY
+from probability_models import resolve_odds
+from schedule import NUM_REGIONS, get_schedule
+
+# Same columns, in the same order, as bracket_results.csv
+GAME_COLUMNS = {
+    "team1": np.int16,
+    "team2": np.int16,
+    "seed_team1": np.int8,
+    "seed_team2": np.int8,
+    "odds_team1": np.float64,
+    "team1_win": np.int8,
+    "tournament_round": np.int8,
+    "day": np.int8,
+}
+
+def build_game_order(topology=DEFAULT_TOPOLOGY):
+    """
+    Column order that lays a winners array out the way simulate_tournament
+    records games: each region's rounds in turn (every round with at least
+    one game per region), then the Final Four and the championship.
+    """
+    order = []
+    region_rounds = [r for r in range(topology.num_rounds) if topology.games_per_round[r] >= NUM_REGIONS]
+    for region in range(NUM_REGIONS):
+        for r in region_rounds:
+            per_region = topology.games_per_round[r] // NUM_REGIONS
+            start = topology.round_offsets[r] + region * per_region
+            order.extend(range(start, start + per_region))
+    for r in range(len(region_rounds), topology.num_rounds):
+        order.extend(range(topology.round_offsets[r], topology.round_offsets[r + 1]))
+    return np.array(order, dtype=np.intp)
+
+GAME_ORDER = build_game_order()
+
+
+@functools.lru_cache(maxsize=None)
+def log_columns(topology=DEFAULT_TOPOLOGY):
+    """
+    Winners columns written to a game log, in log order: every game that
+    is played (games decided by a bye are not), ordered as GAME_ORDER.
+    """
+    order = build_game_order(topology)
+    return order[get_schedule(topology).game_days[order] > 0]
+
+
+def games_from_winners(winners, topology=DEFAULT_TOPOLOGY, odds=None):
+    """
+    Expand a (n, 63) winners array into bracket_results.csv-style columns.
+
+    Args:
+        winners: Array returned by batch_simulation.simulate_tournaments
+        topology: Field the winners array belongs to
+        odds: Seed odds table or probability_models.ProbabilityModel for
+            the odds_team1 column (defaults to calculate_odds.get_odds_table())
+
+    Returns:
+        dict: column name -> flat array of one row per played game (63 for
+        the standard field, see log_columns), tournament by tournament,
+        each in simulate_tournament's game order. Teams are numbered
+        team index + 1. Days come from the fixed schedule (see
+        schedule.Schedule).
+    """
+    n = len(winners)
+    num_games = topology.num_games
+    table, index = resolve_odds(odds, topology)
+
+    team1 = np.empty((n, num_games), dtype=topology.dtype)
+    team2 = np.empty((n, num_games), dtype=topology.dtype)
+    rounds = np.empty(num_games, dtype=np.int8)
+    previous = np.broadcast_to(topology.slots, (n, len(topology.slots)))
+    for r in range(topology.num_rounds):
+        cols = topology.round_columns(r)
+        team1[:, cols] = previous[:, 0::2]
+        team2[:, cols] = previous[:, 1::2]
+        rounds[cols] = r
+        previous = winners[:, cols]
+
+    # Only played games are kept, so the bye entries appended here are never read
+    seeds = np.append(topology.seeds, 0)
+    odds_rounds = np.asarray(topology.odds_rounds)[rounds]
+    columns = {
+        "team1": team1.astype(np.int16) + 1,
+        "team2": team2.astype(np.int16) + 1,
+        "seed_team1": seeds[team1],
+        "seed_team2": seeds[team2],
+        "odds_team1": table[odds_rounds, index[team1], index[team2]],
+        "team1_win": (winners == team1).astype(np.int8),
+        "tournament_round": np.broadcast_to(rounds, (n, num_games)),
+        "day": np.broadcast_to(get_schedule(topology).game_days, (n, num_games)),
+    }
+    order = log_columns(topology)
+    return {name: col[:, order].ravel() for name, col in columns.items()}
+
+
+def winners_from_columns(columns, topology=DEFAULT_TOPOLOGY):
+    """
+    Inverse of games_from_winners: rebuild the (n, 63) winners array.
+
+    Args:
+        columns: bracket_results.csv-style columns (a dict of arrays, a
+            DataFrame or read_game_log output) holding whole tournaments,
+            one row per played game (see log_columns), consecutive per
+            tournament in any game order
+        topology: Field the games belong to
+
+    Returns:
+        np.ndarray: (n, num_games) winners array of topology.dtype; games
+        decided by a bye are filled in from the bracket
+    """
+    team1 = np.asarray(columns["team1"], dtype=np.intp)
+    team2 = np.asarray(columns["team2"], dtype=np.intp)
+    rounds = np.asarray(columns["tournament_round"], dtype=np.intp)
+    rows_per_tournament = len(log_columns(topology))
+    if len(team1) % rows_per_tournament:
+        raise ValueError(f"Expected a multiple of {rows_per_tournament} rows, got {len(team1)}")
+
+    winner = np.where(np.asarray(columns["team1_win"]) != 0, team1, team2) - 1
+    cols = np.asarray(topology.round_offsets)[rounds] + (topology.positions[winner] >> (rounds + 1))
+    n = len(team1) // rows_per_tournament
+    winners = np.empty((n, topology.num_games), dtype=topology.dtype)
+    winners[np.repeat(np.arange(n), rows_per_tournament), cols] = winner
+
+    return fill_byes(winners, topology)
+
+
+def fill_byes(winners, topology=DEFAULT_TOPOLOGY):
+    """
+    Fill in, in place, the games of a winners array that are decided by a
+    bye rather than played: a team facing a bye advances and two byes
+    leave a bye. Played games must already be set.
+
+    Returns:
+        np.ndarray: winners
+    """
+    if not topology.has_byes:
+        return winners
+    unplayed = get_schedule(topology).game_days == 0
+    previous = np.broadcast_to(topology.slots, (len(winners), len(topology.slots)))
+    for r in range(topology.num_rounds):
+        cols = topology.round_columns(r)
+        first, second = previous[:, 0::2], previous[:, 1::2]
+        advancing = np.where(second == topology.bye, first, second)
+        round_winners = winners[:, cols]
+        round_winners[:, unplayed[cols]] = advancing[:, unplayed[cols]]
+        previous = round_winners
+    return winners
+
+
+class GameLogWriter:
+    """
+    Stream simulated games to disk in fixed-size chunks.
+
+    Formats:
+        'csv': a single CSV file with the bracket_results.csv columns
+        'columnar': a directory with one raw little-endian file per column
+            (<column>.bin) plus meta.json recording dtypes and row count;
+            read it back with read_game_log or np.memmap
+
+    Only one chunk of rows is ever held in memory, so the log can cover any
+    number of tournaments.
+    """
+
+    def __init__(self, path, format="csv", chunk_rows=1_000_000):
+        if format not in ("csv", "columnar"):
+            raise ValueError(f"Unknown game log format: {format}")
+        self.path = path
+        self.format = format
+        self.chunk_rows = chunk_rows
+        self.rows_written = 0
+        self._buffer = {name: [] for name in GAME_COLUMNS}
+        self._buffered_rows = 0
+
+        if format == "csv":
+            self._file = open(path, "w", newline="")
+            self._file.write(",".join(GAME_COLUMNS) + "\n")
+        else:
+            os.makedirs(path, exist_ok=True)
+            self._file = {
+                name: open(os.path.join(path, f"{name}.bin"), "wb")
+                for name in GAME_COLUMNS
+            }
+
+    def write_columns(self, columns):
+        """Append rows given as a dict of equal-length column arrays."""
+        rows = len(columns["team1"])
+        for name, dtype in GAME_COLUMNS.items():
+            self._buffer[name].append(np.asarray(columns[name], dtype=dtype))
+        self._buffered_rows += rows
+        if self._buffered_rows >= self.chunk_rows:
+            self.flush()
+
+    def write_games(self, games):
+        """Append a list of games (GameRecords or dicts) from simulate_tournament."""
+        if games:
+            self.write_columns({name: [game[name] for game in games] for name in GAME_COLUMNS})
+
+    def write_winners(self, winners, topology=DEFAULT_TOPOLOGY, odds=None):
+        """Append every game of a (n, 63) winners array (see games_from_winners)."""
+        self.write_columns(games_from_winners(winners, topology, odds))
+
+    def flush(self):
+        if not self._buffered_rows:
+            return
+        columns = {name: np.concatenate(parts) for name, parts in self._buffer.items()}
+        if self.format == "csv":
+            pd.DataFrame(columns).to_csv(self._file, header=False, index=False)
+        else:
+            for name, col in columns.items():
+                col.astype(col.dtype.newbyteorder("<"), copy=False).tofile(self._file[name])
+        self.rows_written += self._buffered_rows
+        self._buffer = {name: [] for name in GAME_COLUMNS}
+        self._buffered_rows = 0
+
+    def close(self):
+        self.flush()
+        if self.format == "csv":
+            self._file.close()
+        else:
+            for f in self._file.values():
+                f.close()
+            meta = {
+                "rows": self.rows_written,
+                "columns": {name: np.dtype(dtype).newbyteorder("<").str
+                            for name, dtype in GAME_COLUMNS.items()},
+            }
+            with open(os.path.join(self.path, "meta.json"), "w") as f:
+                json.dump(meta, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_game_log(path, mmap=True):
+    """
+    Load a game log written by GameLogWriter.
+
+    CSV logs come back as a DataFrame. Columnar logs come back as a dict
+    of arrays, memory-mapped unless mmap is False.
+    """
+    if not os.path.isdir(path):
+        return pd.read_csv(path)
+
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    columns = {}
+    for name, dtype in meta["columns"].items():
+        file = os.path.join(path, f"{name}.bin")
+        if mmap and meta["rows"]:
+            columns[name] = np.memmap(file, dtype=dtype, mode="r", shape=(meta["rows"],))
+        else:
+            columns[name] = np.fromfile(file, dtype=dtype, count=meta["rows"])
+    return columns
+
+
+def simulate_to_log(n, path, format="csv", rng=None, chunk_size=65536, topology=DEFAULT_TOPOLOGY,
+                    odds=None):
+    """Simulate n tournaments of a field and stream every played game into a log at path."""
+    rng = make_rng(rng)
+    with GameLogWriter(path, format, chunk_rows=chunk_size * len(log_columns(topology))) as writer:
+        for start in range(0, n, chunk_size):
+            count = min(chunk_size, n - start)
+            winners = simulate_tournaments(count, rng, chunk_size=chunk_size, odds=odds, topology=topology)
+            writer.write_winners(winners, topology, odds)
+    return writer.rows_written
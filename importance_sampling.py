@@ -0,0 +1,158 @@
+import numpy as np
+
+from calculate_odds import NUM_ROUNDS, NUM_SEEDS, get_odds_table
+from batch_simulation import simulate_tournaments_weighted
+from bracket_topology import DEFAULT_TOPOLOGY
+from probability_models import ProbabilityModel
+
+
+class TiltedModel(ProbabilityModel):
+    """
+    A ProbabilityModel with tilt_odds' tilt applied on top: in the tilted
+    rounds a favored team beats a non-favored one with probability at
+    least min_prob.
+    """
+
+    def __init__(self, model, favored, min_prob=0.5, rounds=None):
+        super().__init__(model.num_teams)
+        self.model = model
+        self.favored = np.asarray(favored, dtype=bool)
+        self.min_prob = min_prob
+        self.tilted_rounds = np.zeros(NUM_ROUNDS, dtype=bool)
+        self.tilted_rounds[list(range(NUM_ROUNDS) if rounds is None else rounds)] = True
+
+    def probability(self, team_a, team_b, rounds):
+        prob = self.model.probability(team_a, team_b, rounds)
+        tilted = self.tilted_rounds[rounds]
+        raise_a = tilted & self.favored[team_a] & ~self.favored[team_b]
+        raise_b = tilted & self.favored[team_b] & ~self.favored[team_a]
+        prob = np.where(raise_a, np.maximum(prob, self.min_prob), prob)
+        return np.where(raise_b, np.minimum(prob, 1 - self.min_prob), prob)
+
+
+def tilt_odds(favored_seeds, min_prob=0.5, rounds=None, odds=None, topology=DEFAULT_TOPOLOGY):
+    """
+    Build a proposal that pushes games toward the upsets of interest.
+
+    Whenever a favored seed plays a non-favored one, the favored side's win
+    probability is raised to at least min_prob. Every other game keeps its
+    real odds, so only the games that matter for the event are tilted.
+
+    Args:
+        favored_seeds: Seeds (1-16) to push through, e.g. [16] or range(10, 17)
+        min_prob: Floor on a favored seed's win probability
+        rounds: Rounds to tilt (all rounds if None)
+        odds: Real odds, a seed odds table or a ProbabilityModel (defaults
+            to calculate_odds.get_odds_table())
+        topology: Field a model's teams belong to
+
+    Returns:
+        (6, 16, 16) proposal table, or a TiltedModel when odds is a model;
+        either can be passed to simulate_tournaments_weighted
+    """
+    if odds is None:
+        odds = get_odds_table()
+    if isinstance(odds, ProbabilityModel):
+        favored = np.isin(topology.seeds, list(favored_seeds))
+        return TiltedModel(odds, favored, min_prob, rounds)
+    if rounds is None:
+        rounds = range(NUM_ROUNDS)
+
+    favored = np.zeros(NUM_SEEDS, dtype=bool)
+    favored[np.asarray(list(favored_seeds), dtype=np.intp) - 1] = True
+    tilted_games = favored[:, None] & ~favored[None, :]
+
+    proposal = odds.copy()
+    for r in rounds:
+        raised = np.where(tilted_games, np.maximum(odds[r], min_prob), odds[r])
+        # Keep the table consistent: P(b beats a) = 1 - P(a beats b)
+        proposal[r] = np.where(tilted_games.T, 1 - raised.T, raised)
+    return proposal
+
+
+def _winner_seeds(topology):
+    # Seed per team index, with 0 for a bye so it never matches a seed
+    return np.append(topology.seeds, 0)
+
+
+def champion_seed_is(winners, seed, topology=DEFAULT_TOPOLOGY):
+    """Boolean per tournament: the champion has the given seed."""
+    return _winner_seeds(topology)[winners[:, -1]] == seed
+
+
+def seeds_reaching(winners, tournament_round, min_seed, topology=DEFAULT_TOPOLOGY):
+    """
+    Number of teams seeded min_seed or worse that win their game in
+    tournament_round, per tournament (e.g. round 2 winners are the Elite 8
+    of the standard field; rounds count the topology's rounds, so a field
+    with play-ins has one more).
+    """
+    round_winners = winners[:, topology.round_columns(tournament_round)]
+    return (_winner_seeds(topology)[round_winners] >= min_seed).sum(axis=1)
+
+
+def weighted_estimate(indicator, weights):
+    """
+    Importance-sampling estimate of P(event).
+
+    Args:
+        indicator: (n,) boolean event outcomes of weighted samples
+        weights: (n,) likelihood-ratio weights
+
+    Returns:
+        dict: 'estimate', 'std_error', 'hits' (samples where the event
+        occurred) and 'ess' (effective sample size of the event's weights)
+    """
+    values = np.where(indicator, weights, 0.0)
+    n = len(values)
+    estimate = values.mean()
+    std_error = values.std(ddof=1) / np.sqrt(n) if n > 1 else np.inf
+    hit_weights = weights[indicator]
+    ess = hit_weights.sum() ** 2 / (hit_weights ** 2).sum() if len(hit_weights) else 0.0
+    return {
+        "estimate": estimate,
+        "std_error": std_error,
+        "hits": int(np.count_nonzero(indicator)),
+        "ess": ess,
+    }
+
+
+def estimate_probability(event, proposal, n=1_000_000, rng=None, chunk_size=65536, locked=None,
+                         odds=None, topology=DEFAULT_TOPOLOGY):
+    """
+    Estimate P(event) with importance sampling.
+
+    Args:
+        event: Function mapping a (n, num_games) winners array to a
+            boolean array
+        proposal: Proposal from tilt_odds
+        n: Number of weighted tournaments
+        odds: Real odds, a seed odds table or a ProbabilityModel
+        topology: Field to simulate
+
+    Returns:
+        dict: as from weighted_estimate, plus 'num_tournaments'
+    """
+    winners, weights = simulate_tournaments_weighted(n, proposal, rng, chunk_size, locked,
+                                                     odds=odds, topology=topology)
+    result = weighted_estimate(event(winners), weights)
+    result["num_tournaments"] = n
+    return result
+
+
+def main():
+    rng = np.random.default_rng()
+
+    result = estimate_probability(
+        lambda w: champion_seed_is(w, 16), tilt_odds([16]), rng=rng
+    )
+    print(f"P(16 seed wins it all) = {result['estimate']:.3e} +/- {result['std_error']:.1e}")
+
+    result = estimate_probability(
+        lambda w: seeds_reaching(w, 2, 10) >= 4, tilt_odds(range(10, 17), rounds=[0, 1, 2]), rng=rng
+    )
+    print(f"P(4+ double-digit seeds in the Elite 8) = {result['estimate']:.3e} +/- {result['std_error']:.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,130 @@ from gymnasium import spaces
 import numpy as np
 import pandas as pd
 
+from advancement import read_advancement
+from bracket_topology import DEFAULT_TOPOLOGY
+
+
+def _readonly(array):
+    """Read-only view of an array."""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class SelectionLog:
+    """
+    Append-only history of entry selections, kept as NumPy columns.
+
+    Rows go into preallocated arrays that double in size when full, so
+    appending is amortized O(1) with no per-row allocation. The DataFrame
+    view is only built when asked for and is cached until the next change.
+    """
+
+    COLUMNS = {
+        'entry_id': np.int64,
+        'team_id': np.int64,
+        'match_no': np.int64,
+        'valid': np.bool_,
+    }
+    DEFAULTS = {'entry_id': -1, 'team_id': -1, 'match_no': -1, 'valid': True}
+
+    def __init__(self, capacity=256):
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        self._size = 0
+        self._frame = None
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, size):
+        capacity = len(self._columns['entry_id'])
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def append(self, entry_id, team_id, match_no, valid):
+        """Record one selection."""
+        self._reserve(self._size + 1)
+        i = self._size
+        self._columns['entry_id'][i] = entry_id
+        self._columns['team_id'][i] = team_id
+        self._columns['match_no'][i] = match_no
+        self._columns['valid'][i] = valid
+        self._size += 1
+        self._frame = None
+
+    def extend(self, df):
+        """Append the rows of a selections DataFrame; missing columns get DEFAULTS."""
+        rows = len(df)
+        self._reserve(self._size + rows)
+        for name, dtype in self.COLUMNS.items():
+            if name in df:
+                values = pd.Series(df[name]).fillna(self.DEFAULTS[name]).to_numpy(dtype=dtype)
+            else:
+                values = self.DEFAULTS[name]
+            self._columns[name][self._size:self._size + rows] = values
+        self._size += rows
+        self._frame = None
+
+    def clear(self):
+        self._size = 0
+        self._frame = None
+
+    def column(self, name):
+        """Read-only view of one column's rows, valid until the next append or clear."""
+        return _readonly(self._columns[name][:self._size])
+
+    def to_frame(self):
+        """The history as a DataFrame (built once per change)."""
+        if self._frame is None:
+            self._frame = pd.DataFrame({name: column[:self._size].copy()
+                                        for name, column in self._columns.items()})
+        return self._frame
+
 
 class MarchMadnessEnv(gym.Env):
     metadata = {'render_modes': ['human']}
+    info_modes = ('none', 'lightweight', 'full')
 
-    def __init__(self, teams_df=None, historical_df=None, num_entries=5, render_mode=None):
+    def __init__(self, teams_df=None, historical_df=None, num_entries=5, render_mode=None,
+                 advancement=None, advancement_round=0, info_mode='lightweight'):
+        """
+        advancement: Optional (64, 6) advancement matrix, or the path of a
+            cached one (see advancement.load_advancement), indexed by
+            bracket_topology team index. When given, the 'odds' observation
+            column is column advancement_round of it instead of the teams
+            DataFrame's odds; see _advancement_teams for how rows map to
+            teams.
+        info_mode: What step and reset put in info:
+            'none': nothing (step's info is an empty dict)
+            'lightweight': step's per-entry 'entries' details plus
+                read-only array views of the env state, 'available_teams',
+                'current_match' and 'selections' (the selection log's
+                columns); no DataFrames are built. The views share memory
+                with the env and are only valid until the next step() or
+                reset(): the selection columns cover the selections made so
+                far and later appends may reallocate them, and the other
+                arrays are updated in place or replaced. Copy them to keep
+                a snapshot.
+            'full': also copies of teams_df and historical_df, as
+                'teams_df' and 'historical_df'
+        """
         super(MarchMadnessEnv, self).__init__()
+        if info_mode not in self.info_modes:
+            raise ValueError(f"info_mode must be one of {self.info_modes}, got {info_mode!r}")
+        self.info_mode = info_mode
 
         self.num_teams = 64
         self.num_matches = 63  # Total number of matches
         self.num_entries = num_entries  # Fixed to 5 entries per participant
         self.render_mode = render_mode
+        self.advancement = None if advancement is None else read_advancement(advancement)
+        self.advancement_round = advancement_round
 
         # Define action space: Each entry selects one team (0-63)
         self.action_space = spaces.MultiDiscrete([self.num_teams] * num_entries)
@@ -52,22 +165,40 @@ class MarchMadnessEnv(gym.Env):
         
         # Initialize matches
         self.matches = self._generate_matches_from_df(teams_df)
+        self._build_match_index()
         
-        # Initialize historical DataFrame
+        # Initialize selection history
+        self.selection_log = SelectionLog()
         if historical_df is not None:
-            self.historical_df = historical_df.copy()
+            self.historical_df = historical_df
             self._process_historical_df()
         else:
             self._init_historical_df()
     
+    @property
+    def teams_df(self):
+        """The teams DataFrame, with 'playable' synced to available_teams when read."""
+        if hasattr(self, 'available_teams'):
+            self._teams_df['playable'] = self.available_teams
+        return self._teams_df
+
+    @teams_df.setter
+    def teams_df(self, df):
+        self._teams_df = df
+
+    @property
+    def historical_df(self):
+        """All selections so far as a DataFrame, built from selection_log on demand."""
+        return self.selection_log.to_frame()
+
+    @historical_df.setter
+    def historical_df(self, df):
+        self.selection_log.clear()
+        self.selection_log.extend(df)
+
     def _init_historical_df(self):
-        """Initialize an empty historical selections DataFrame"""
-        self.historical_df = pd.DataFrame({
-            'entry_id': [],
-            'team_id': [],
-            'match_no': [],
-            'valid': []
-        })
+        """Initialize an empty selection history"""
+        self.selection_log.clear()
 
     def _process_historical_df(self):
         """Process historical DataFrame to update used teams for each entry"""
@@ -105,7 +236,7 @@ class MarchMadnessEnv(gym.Env):
             return
             
         # Store the DataFrame
-        self.historical_df = historical_df.copy()
+        self.historical_df = historical_df
         
         # Reset entry tracking that depends on history
         for entry_id in range(self.num_entries):
@@ -133,22 +264,22 @@ class MarchMadnessEnv(gym.Env):
                         # If it has a match number, it was a successful selection
                         if match_no > 0:
                             # Find the loser for this match
-                            for team1, team2 in self.matches:
-                                if (team1 == team_id or team2 == team_id) and match_no-1 < len(self.matches):
-                                    loser = team2 if team1 == team_id else team1
-                                    
-                                    # Record in action history
-                                    self.action_history[entry_id].append({
-                                        'match': match_no,
-                                        'winner': team_id,
-                                        'loser': loser,
-                                        'winner_name': self.team_names[team_id] if hasattr(self, 'team_names') else f'Team_{team_id}',
-                                        'loser_name': self.team_names[loser] if hasattr(self, 'team_names') else f'Team_{loser}'
-                                    })
-                                    
-                                    # Mark loser as unavailable
-                                    self.available_teams[loser] = 0
-                                    break
+                            match_idx = self.team_match[team_id]
+                            if match_idx >= 0 and match_no-1 < len(self.matches):
+                                team1, team2 = self.matches[match_idx]
+                                loser = team2 if team1 == team_id else team1
+                                
+                                # Record in action history
+                                self.action_history[entry_id].append({
+                                    'match': match_no,
+                                    'winner': team_id,
+                                    'loser': loser,
+                                    'winner_name': self.team_names[team_id] if hasattr(self, 'team_names') else f'Team_{team_id}',
+                                    'loser_name': self.team_names[loser] if hasattr(self, 'team_names') else f'Team_{loser}'
+                                })
+                                
+                                # Mark loser as unavailable
+                                self._eliminate(loser)
                             
                             # Increment match counter for valid selections
                             self.current_match[entry_id] += 1
@@ -189,6 +320,35 @@ class MarchMadnessEnv(gym.Env):
         
         return matches
 
+    def _build_match_index(self):
+        """
+        Index every team's match and the set of active matches.
+
+        team_match[t] is the position in self.matches of team t's match
+        (-1 if it has none), and active_matches holds the positions of
+        matches whose teams are both still available. _eliminate keeps the
+        set current, so finding a team's active match is one lookup.
+        """
+        self.team_match = np.full(self.num_teams, -1, dtype=int)
+        for idx, (team1, team2) in enumerate(self.matches):
+            for team in (team1, team2):
+                if self.team_match[team] < 0:
+                    self.team_match[team] = idx
+        self.active_matches = {
+            idx for idx, (team1, team2) in enumerate(self.matches)
+            if self.available_teams[team1] and self.available_teams[team2]
+        }
+
+    def _eliminate(self, team):
+        """Mark a team unavailable and deactivate its match."""
+        self.available_teams[team] = 0
+        self.active_matches.discard(self.team_match[team])
+
+    def _active_match(self, team):
+        """Index of team's active match, or None."""
+        match_idx = self.team_match[team]
+        return int(match_idx) if match_idx in self.active_matches else None
+
     def update_teams_state(self, df):
         """Update the environment's state using a teams DataFrame"""
         if len(df) != self.num_teams:
@@ -196,9 +356,42 @@ class MarchMadnessEnv(gym.Env):
         
         self.teams_df = df.copy()
         self.seeds = df['teamseed'].to_numpy(dtype=int)
-        self.available_teams = df['playable'].to_numpy(dtype=int)
-        self.odds = df['odds'].to_numpy(dtype=float)
+        self.available_teams = df['playable'].to_numpy(dtype=int, copy=True)
+        if self.advancement is not None:
+            teams = self._advancement_teams(df)
+            self.odds = np.asarray(self.advancement[teams, self.advancement_round], dtype=float)
+        else:
+            self.odds = df['odds'].to_numpy(dtype=float)
         self.team_names = df.get('teamname', pd.Series([f'Team_{i}' for i in range(self.num_teams)])).tolist()
+        if hasattr(self, 'matches'):
+            self._build_match_index()
+
+    def _advancement_teams(self, df):
+        """
+        Advancement-matrix row of each teams DataFrame row.
+
+        A 'team' column, if present, holds 1-based team numbers as in
+        tournament_data.csv. Otherwise rows are taken to be in bracket slot
+        order (region by region, seeds 1, 16, 8, 9, ... with each match's
+        teams adjacent), so row i is team DEFAULT_TOPOLOGY.slots[i]. Either
+        way the rows' seeds must match the teams' seeds, so a DataFrame in
+        some other order fails here instead of reading another team's odds.
+        """
+        topology = DEFAULT_TOPOLOGY
+        if 'team' in df:
+            teams = df['team'].to_numpy(dtype=int) - 1
+            if teams.min() < 0 or teams.max() >= topology.num_teams:
+                raise ValueError(f"Team numbers must be between 1 and {topology.num_teams}")
+        else:
+            teams = topology.slots
+        mismatched = np.flatnonzero(self.seeds != topology.seeds[teams])
+        if len(mismatched):
+            row = mismatched[0]
+            raise ValueError(
+                f"Teams DataFrame seeds do not match the bracket: row {row} has seed {self.seeds[row]}, "
+                f"its team has seed {topology.seeds[teams[row]]} ({len(mismatched)} rows differ)"
+            )
+        return teams
 
     def get_observation(self):
         """Get the current observation"""
@@ -210,10 +403,10 @@ class MarchMadnessEnv(gym.Env):
         
         # Add match numbers
         match_assignments = np.zeros(self.num_teams)
-        for idx, (team1, team2) in enumerate(self.matches):
-            if self.available_teams[team1] and self.available_teams[team2]:
-                match_assignments[team1] = idx + 1
-                match_assignments[team2] = idx + 1
+        for idx in self.active_matches:
+            team1, team2 = self.matches[idx]
+            match_assignments[team1] = idx + 1
+            match_assignments[team2] = idx + 1
         teams_status[:, 3] = match_assignments
         
         return {
@@ -252,7 +445,6 @@ class MarchMadnessEnv(gym.Env):
         # Process each entry's selection
         rewards = np.zeros(self.num_entries)
         infos = {'entries': [{} for _ in range(self.num_entries)]}
-        historical_entries = []
         
         # Reset tracking for this step
         self.last_attempted_team = list(actions)  # Store all attempted selections
@@ -277,27 +469,17 @@ class MarchMadnessEnv(gym.Env):
                 infos['entries'][entry_id]['status'] = 'done'
                 self.last_selection_reason[entry_id] = "Entry already completed"
                 
-                # Record in historical DataFrame even if invalid
-                historical_entries.append({
-                    'entry_id': entry_id,
-                    'team_id': team,
-                    'match_no': -1,
-                    'valid': False
-                })
+                # Record in the selection log even if invalid
+                self.selection_log.append(entry_id, team, -1, False)
                 continue
             
             # Initialize info
-            is_in_match = False
             is_playable = self.available_teams[team] == 1
             is_used = team in self.used_teams[entry_id]
             
             # Find the match involving this team
-            match_idx = None
-            for idx, (team1, team2) in enumerate(self.matches):
-                if (team == team1 or team == team2) and self.available_teams[team1] and self.available_teams[team2]:
-                    match_idx = idx
-                    is_in_match = True
-                    break
+            match_idx = self._active_match(team)
+            is_in_match = match_idx is not None
             
             infos['entries'][entry_id]['is_in_match'] = is_in_match
             infos['entries'][entry_id]['is_playable'] = is_playable
@@ -308,39 +490,24 @@ class MarchMadnessEnv(gym.Env):
                 self.last_selection_reason[entry_id] = "Team not playable"
                 infos['entries'][entry_id]['processed'] = False
                 
-                # Record in historical DataFrame even if invalid
-                historical_entries.append({
-                    'entry_id': entry_id,
-                    'team_id': team,
-                    'match_no': -1,
-                    'valid': False
-                })
+                # Record in the selection log even if invalid
+                self.selection_log.append(entry_id, team, -1, False)
                 continue
                 
             if not is_in_match:
                 self.last_selection_reason[entry_id] = "Team not in an active match"
                 infos['entries'][entry_id]['processed'] = False
                 
-                # Record in historical DataFrame even if invalid
-                historical_entries.append({
-                    'entry_id': entry_id,
-                    'team_id': team,
-                    'match_no': -1,
-                    'valid': False
-                })
+                # Record in the selection log even if invalid
+                self.selection_log.append(entry_id, team, -1, False)
                 continue
                 
             if is_used:
                 self.last_selection_reason[entry_id] = "Team already used by this entry"
                 infos['entries'][entry_id]['processed'] = False
                 
-                # Record in historical DataFrame even if invalid
-                historical_entries.append({
-                    'entry_id': entry_id,
-                    'team_id': team,
-                    'match_no': -1,
-                    'valid': False
-                })
+                # Record in the selection log even if invalid
+                self.selection_log.append(entry_id, team, -1, False)
                 continue
             
             # If we reach here, the selection is valid
@@ -362,24 +529,16 @@ class MarchMadnessEnv(gym.Env):
                 'loser_name': self.team_names[loser] if hasattr(self, 'team_names') else f'Team_{loser}'
             })
             
-            # Update historical DataFrame
-            historical_entries.append({
-                'entry_id': entry_id,
-                'team_id': winner,
-                'match_no': match_number,
-                'valid': True
-            })
+            # Record in the selection log
+            self.selection_log.append(entry_id, winner, match_number, True)
             
             # Update team availability globally
-            self.available_teams[loser] = 0
+            self._eliminate(loser)
             self.current_match[entry_id] += 1
             rewards[entry_id] = 1  # Basic reward
             
             # Check if tournament is complete
-            remaining_matches = sum(1 for t1, t2 in self.matches 
-                                    if self.available_teams[t1] and self.available_teams[t2])
-            
-            if remaining_matches == 0:
+            if not self.active_matches:
                 self.done[entry_id] = True
                 self.champion[entry_id] = winner
                 rewards[entry_id] = 10  # Bonus for completing tournament
@@ -388,23 +547,17 @@ class MarchMadnessEnv(gym.Env):
                 'processed': True
             })
         
-        # Update historical DataFrame
-        if historical_entries:
-            new_df = pd.DataFrame(historical_entries)
-            self.historical_df = pd.concat([self.historical_df, new_df], ignore_index=True)
-        
-        # Update teams_df with current availability
-        self.teams_df['playable'] = self.available_teams
-        
         # Create observation, check termination
         observation = self.get_observation()
         terminated = all(self.done)
         truncated = False
         reward = sum(rewards)
         
-        # Add DataFrames to info
-        infos['teams_df'] = self.teams_df.copy()
-        infos['historical_df'] = self.historical_df.copy()
+        # Add state to info
+        if self.info_mode == 'none':
+            infos = {}
+        else:
+            infos.update(self._state_info())
         
         # Render if requested
         if self.render_mode == 'human':
@@ -440,10 +593,12 @@ class MarchMadnessEnv(gym.Env):
             self.original_teams_df = teams_df.copy()
             self.update_teams_state(teams_df)
             self.matches = self._generate_matches_from_df(teams_df)
+            self._build_match_index()
         else:
             # Reset to original state
             self.update_teams_state(self.original_teams_df)
             self.matches = self._generate_matches_from_df(self.original_teams_df)
+            self._build_match_index()
         
         # Reset entry tracking
         for entry_id in range(self.num_entries):
@@ -461,7 +616,7 @@ class MarchMadnessEnv(gym.Env):
         
         # Reset or update historical DataFrame
         if historical_df is not None:
-            self.historical_df = historical_df.copy()
+            self.historical_df = historical_df
             self._process_historical_df()
         else:
             self._init_historical_df()
@@ -469,10 +624,7 @@ class MarchMadnessEnv(gym.Env):
         # Get initial observation
         observation = self.get_observation()
         
-        info = {
-            'teams_df': self.teams_df.copy(),
-            'historical_df': self.historical_df.copy()
-        }
+        info = self._state_info() if self.info_mode != 'none' else {}
         
         # Render if requested
         if self.render_mode == 'human':
@@ -480,6 +632,18 @@ class MarchMadnessEnv(gym.Env):
             
         return observation, info
     
+    def _state_info(self):
+        """Env state for info, as set by info_mode"""
+        info = {
+            'available_teams': _readonly(self.available_teams),
+            'current_match': _readonly(self.current_match),
+            'selections': {name: self.selection_log.column(name) for name in SelectionLog.COLUMNS},
+        }
+        if self.info_mode == 'full':
+            info['teams_df'] = self.teams_df.copy()
+            info['historical_df'] = self.historical_df.copy()
+        return info
+
     def render(self):
         """Render the current state of the environment"""
         print("\n===== MARCH MADNESS TOURNAMENT STATE =====")
@@ -487,11 +651,11 @@ class MarchMadnessEnv(gym.Env):
         
         # Show active matches
         active_matches = []
-        for idx, (team1, team2) in enumerate(self.matches):
-            if self.available_teams[team1] and self.available_teams[team2]:
-                t1_name = self.team_names[team1] if hasattr(self, 'team_names') else f'Team_{team1}'
-                t2_name = self.team_names[team2] if hasattr(self, 'team_names') else f'Team_{team2}'
-                active_matches.append((idx+1, t1_name, t2_name))
+        for idx in sorted(self.active_matches):
+            team1, team2 = self.matches[idx]
+            t1_name = self.team_names[team1] if hasattr(self, 'team_names') else f'Team_{team1}'
+            t2_name = self.team_names[team2] if hasattr(self, 'team_names') else f'Team_{team2}'
+            active_matches.append((idx+1, t1_name, t2_name))
         
         if active_matches:
             print("\nActive Matches:")
@@ -0,0 +1,275 @@
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+
+from calculate_odds import NUM_ROUNDS, NUM_SEEDS, WINRATES_CSV, load_winrates, write_cache_file
+from bracket_topology import DEFAULT_TOPOLOGY, standard_seed_order
+from probability_models import (
+    ELO_SCALE, BradleyTerryModel, EloModel, LogisticModel, SeedRatioModel
+)
+
+FIT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fit_cache")
+MODEL_KINDS = ("seed_ratio", "bradley_terry", "logistic", "elo")
+# Elo ratings are anchored so the average seed sits here
+ELO_BASE = 1500.0
+
+# Seed indices (seed - 1) of one region in bracket slot order
+_REGION_ORDER = np.array(standard_seed_order(NUM_SEEDS)) - 1
+_REGION_ROUNDS = NUM_SEEDS.bit_length() - 1
+
+
+def load_counts(csv_path=WINRATES_CSV):
+    """
+    Win and loss counts per (round, seed) from winrates.csv.
+
+    Returns:
+        wins, losses: (6, 16) float arrays; seed s is at column s - 1 and
+        cells missing from the CSV count as no games
+    """
+    tables = load_winrates(csv_path)
+    wins = np.nan_to_num(np.array(tables['win'])).reshape(NUM_ROUNDS, NUM_SEEDS)
+    losses = np.nan_to_num(np.array(tables['loss'])).reshape(NUM_ROUNDS, NUM_SEEDS)
+    return wins, losses
+
+
+def seed_advancement(ratings):
+    """
+    Exact P(seed wins its round-r game) in the standard four-region field.
+
+    A logistic-in-rating model over seeds: P(a beats b in round r) is
+    1 / (1 + exp(ratings[r, b] - ratings[r, a])), which covers the
+    Bradley-Terry (ratings = log strengths), seed-ratio, logistic and Elo
+    models. All four regions are identical, so one region is solved with
+    the same bottom-up recursion as exact_odds and the two national rounds
+    pair up identically distributed regional champions.
+
+    Args:
+        ratings: (..., 6, 16) ratings; leading axes are a batch of
+            parameter sets evaluated together
+
+    Returns:
+        np.ndarray: (..., 6, 16) advancement probabilities per seed
+    """
+    ratings = np.asarray(ratings, dtype=float)
+    batch = ratings.shape[:-2]
+    win = 1 / (1 + np.exp(ratings[..., None, :] - ratings[..., :, None]))
+    advancement = np.empty(ratings.shape)
+
+    alive = np.ones(batch + (NUM_SEEDS,))
+    for r in range(_REGION_ROUNDS):
+        size = 1 << r
+        games = NUM_SEEDS // (2 * size)
+        block = alive.reshape(batch + (games, 2, size))
+        order = _REGION_ORDER.reshape(games, 2, size)
+        game_win = win[..., r, :, :][..., order[:, 0, :, None], order[:, 1, None, :]]
+        left = block[..., 0, :] * np.einsum('...gij,...gj->...gi', game_win, block[..., 1, :])
+        right = block[..., 1, :] * np.einsum('...gij,...gi->...gj', 1 - game_win, block[..., 0, :])
+        alive = np.stack((left, right), axis=-2).reshape(batch + (NUM_SEEDS,))
+        advancement[..., r, _REGION_ORDER] = alive
+
+    # National rounds: the opponent comes out of the other half of the
+    # field, which holds 2 ** (r - 4) identical regions
+    for r in range(_REGION_ROUNDS, NUM_ROUNDS):
+        previous = advancement[..., r - 1, :]
+        opponents = previous * 2 ** (r - _REGION_ROUNDS)
+        advancement[..., r, :] = previous * np.einsum('...ij,...j->...i', win[..., r, :, :], opponents)
+    return advancement
+
+
+def log_likelihood(ratings, wins, losses):
+    """
+    Log-likelihood of the (round, seed) win/loss counts under `ratings`.
+
+    Each seed's games in round r are Bernoulli trials with the model's
+    P(win round r | reached round r), i.e. the seed's record is compared
+    against the opponents the model itself sends its way.
+
+    Args:
+        ratings: (..., 6, 16) batch of ratings as for seed_advancement
+        wins, losses: (6, 16) counts, possibly smoothed
+
+    Returns:
+        np.ndarray: Log-likelihood per parameter set, shape ratings.shape[:-2]
+    """
+    advancement = seed_advancement(ratings)
+    reached = np.concatenate((np.ones(advancement.shape[:-2] + (1, NUM_SEEDS)),
+                              advancement[..., :-1, :]), axis=-2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = np.clip(advancement / reached, 1e-12, 1 - 1e-12)
+    return (wins * np.log(p) + losses * np.log1p(-p)).sum(axis=(-2, -1))
+
+
+def _maximize(objective, x0, max_iter=500, tol=1e-7, step=1e-6):
+    """
+    BFGS ascent on a batched objective.
+
+    objective maps a (k, p) array of parameter vectors to (k,) values, so
+    the forward-difference gradient and every candidate step length of
+    the line search each cost one vectorized call.
+    """
+    x = np.asarray(x0, dtype=float)
+    p = len(x)
+    steps = 0.5 ** np.arange(30)
+
+    def value_and_grad(x):
+        points = np.vstack((x, x + step * np.eye(p)))
+        values = objective(points)
+        return values[0], (values[1:] - values[0]) / step
+
+    value, grad = value_and_grad(x)
+    inverse_hessian = np.eye(p)
+    for _ in range(max_iter):
+        direction = inverse_hessian @ grad
+        if direction @ grad <= 0:
+            # Lost ascent direction; restart from the gradient
+            inverse_hessian = np.eye(p)
+            direction = grad
+        candidates = objective(x + steps[:, None] * direction)
+        accepted = np.flatnonzero(candidates >= value + 1e-4 * steps * (direction @ grad))
+        if not len(accepted):
+            break
+        new_x = x + steps[accepted[0]] * direction
+        new_value, new_grad = value_and_grad(new_x)
+
+        s, y = new_x - x, new_grad - grad
+        x, grad = new_x, new_grad
+        improvement, value = new_value - value, new_value
+        if improvement < tol * (1 + abs(value)):
+            break
+        sy = -(s @ y)
+        if sy > 1e-12:
+            # Standard BFGS update of the inverse Hessian of -objective
+            rho = 1 / sy
+            identity = np.eye(p)
+            inverse_hessian = ((identity + rho * np.outer(s, y)) @ inverse_hessian
+                               @ (identity + rho * np.outer(y, s)) + rho * np.outer(s, s))
+    return x
+
+
+def fit_ratings(wins, losses, per_round=False, pseudo_count=0.5, ridge=0.0, round_shrinkage=1.0,
+                max_iter=500):
+    """
+    Maximum-likelihood seed ratings from win/loss counts.
+
+    Args:
+        wins, losses: (6, 16) counts as from load_counts
+        per_round: Fit a separate rating per (round, seed) instead of one
+            per seed
+        pseudo_count: Added to both the wins and the losses of every cell
+            that saw games, so sparse late-round cells (a 16 seed in round
+            1, say) cannot push a probability to 0 or 1
+        ridge: L2 penalty pulling every rating toward 0
+        round_shrinkage: With per_round, L2 penalty pulling each seed's
+            per-round ratings toward that seed's mean rating, so rounds
+            with few games borrow strength from the others
+        max_iter: BFGS iteration cap
+
+    Returns:
+        np.ndarray: (16,) or (6, 16) ratings on the natural-log odds scale,
+        centered to mean 0
+    """
+    wins = np.asarray(wins, dtype=float)
+    losses = np.asarray(losses, dtype=float)
+    played = (wins + losses) > 0
+    wins = wins + pseudo_count * played
+    losses = losses + pseudo_count * played
+
+    def objective(points):
+        if per_round:
+            ratings = points.reshape(-1, NUM_ROUNDS, NUM_SEEDS)
+            deviation = ratings - ratings.mean(axis=1, keepdims=True)
+            penalty = round_shrinkage * np.square(deviation).sum(axis=(1, 2))
+        else:
+            ratings = np.broadcast_to(points[:, None, :], (len(points), NUM_ROUNDS, NUM_SEEDS))
+            penalty = 0.0
+        penalty = penalty + ridge * np.square(points).sum(axis=1)
+        return log_likelihood(ratings, wins, losses) - penalty
+
+    # Start from the ordering of the seeds themselves
+    start = np.linspace(1.5, -1.5, NUM_SEEDS)
+    x0 = np.tile(start, NUM_ROUNDS) if per_round else start
+    ratings = _maximize(objective, x0, max_iter=max_iter)
+    if per_round:
+        ratings = ratings.reshape(NUM_ROUNDS, NUM_SEEDS)
+        return ratings - ratings.mean(axis=1, keepdims=True)
+    return ratings - ratings.mean()
+
+
+def _cache_key(data, options):
+    # Spell out defaults so equivalent calls share an entry
+    defaults = {name: param.default for name, param in inspect.signature(fit_ratings).parameters.items()
+                if param.default is not inspect.Parameter.empty}
+    options = {**defaults, **options}
+    digest = hashlib.sha256(data)
+    digest.update(json.dumps(options, sort_keys=True).encode())
+    return digest.hexdigest()[:32]
+
+
+def load_fitted_ratings(csv_path=WINRATES_CSV, cache_dir=FIT_CACHE_DIR, use_cache=True, **options):
+    """
+    fit_ratings on a winrates CSV, cached on disk.
+
+    Fitted ratings are stored in cache_dir under a key built from the
+    CSV's SHA-256 and the fit options, so they are reused until the data
+    or the options change and startup never refits.
+
+    Args:
+        csv_path: winrates.csv to fit
+        cache_dir: Directory for cached fits
+        use_cache: Read and write the cache
+        **options: Keyword arguments for fit_ratings
+
+    Returns:
+        np.ndarray: Ratings as from fit_ratings
+    """
+    with open(csv_path, "rb") as f:
+        data = f.read()
+    path = os.path.join(cache_dir, _cache_key(data, options) + ".npy")
+
+    if use_cache:
+        try:
+            return np.load(path)
+        except (OSError, ValueError):
+            pass
+
+    ratings = fit_ratings(*load_counts(csv_path), **options)
+    if use_cache:
+        write_cache_file(path, lambda f: np.save(f, ratings))
+    return ratings
+
+
+def fit_model(kind="bradley_terry", csv_path=WINRATES_CSV, topology=DEFAULT_TOPOLOGY,
+              use_cache=True, **options):
+    """
+    Fit a probability model to winrates.csv.
+
+    Every kind is the same logistic-in-rating family on a different scale,
+    so they share one fit (and one cache entry) per set of options.
+
+    Args:
+        kind: One of MODEL_KINDS. "seed_ratio" always fits per-round
+            ratings, like the winrate table it replaces.
+        csv_path: winrates.csv to fit
+        topology: Field to build the model for
+        use_cache: Use the on-disk fit cache (see load_fitted_ratings)
+        **options: Keyword arguments for fit_ratings
+
+    Returns:
+        probability_models.ProbabilityModel
+    """
+    if kind not in MODEL_KINDS:
+        raise ValueError(f"Unknown model kind {kind!r}, expected one of {MODEL_KINDS}")
+    if kind == "seed_ratio":
+        options["per_round"] = True
+    ratings = load_fitted_ratings(csv_path, use_cache=use_cache, **options)
+
+    if kind == "seed_ratio":
+        return SeedRatioModel(np.exp(ratings), topology)
+    if kind == "bradley_terry":
+        return BradleyTerryModel.for_seeds(np.exp(ratings), topology)
+    if kind == "logistic":
+        return LogisticModel.for_seeds(ratings, topology)
+    return EloModel.for_seeds(ELO_BASE + ratings * ELO_SCALE, topology)
@@ -0,0 +1,264 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from calculate_odds import spawn_rngs
+from batch_simulation import TEAM_SEEDS, simulate_tournaments
+from bracket_topology import DEFAULT_TOPOLOGY
+
+NUM_TEAMS = DEFAULT_TOPOLOGY.num_teams
+
+
+class SimulationAggregates:
+    """
+    Compact, mergeable counters for a batch of simulated tournaments.
+
+    Attributes:
+        num_tournaments: Number of tournaments counted
+        wins: (64, 6) int64 array, wins[t, r] is how often team t won its
+            round-r game (i.e. reached round r + 1); wins[:, 5] are titles
+        upsets: (6,) int64 array of games per round won by the worse seed
+        topology: bracket_topology.BracketTopology the counts refer to;
+            other fields size wins and upsets by its teams and rounds
+    """
+
+    def __init__(self, num_tournaments=0, wins=None, upsets=None, topology=DEFAULT_TOPOLOGY):
+        self.num_tournaments = num_tournaments
+        self.topology = topology
+        shape = (topology.num_teams, topology.num_rounds)
+        self.wins = np.zeros(shape, dtype=np.int64) if wins is None else wins
+        self.upsets = np.zeros(topology.num_rounds, dtype=np.int64) if upsets is None else upsets
+
+    @property
+    def champion_counts(self):
+        return self.wins[:, -1]
+
+    @property
+    def round_reached_counts(self):
+        """(64, 7) counts of reaching each round; column 0 is the whole field."""
+        reached = np.empty((self.wins.shape[0], self.wins.shape[1] + 1), dtype=np.int64)
+        reached[:, 0] = self.num_tournaments
+        reached[:, 1:] = self.wins
+        return reached
+
+    def probabilities(self):
+        """(64, 6) estimated P(team wins its round-r game)."""
+        return self.wins / max(self.num_tournaments, 1)
+
+    def half_widths(self, confidence=0.95):
+        """
+        (64, 6) confidence-interval half-widths of probabilities().
+
+        Uses the Agresti-Coull interval, which stays sensible for teams
+        that have not (yet) won a game in the sample.
+        """
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        n = self.num_tournaments + z * z
+        p = (self.wins + z * z / 2) / n
+        return z * np.sqrt(p * (1 - p) / n)
+
+    def add_winners(self, winners):
+        """Count a (n, 63) winners array from simulate_tournaments."""
+        topology = self.topology
+        num_teams = topology.num_teams
+        # Byes rank below every seed, so advancing past one is never an upset
+        seeds = np.append(topology.seeds, np.iinfo(np.int64).max).astype(np.int64)
+        previous = np.broadcast_to(topology.slots, (len(winners), len(topology.slots)))
+        for r in range(topology.num_rounds):
+            round_winners = winners[:, topology.round_columns(r)]
+            counts = np.bincount(round_winners.ravel(), minlength=num_teams + 1)
+            self.wins[:, r] += counts[:num_teams]
+
+            # The loser is whichever of the two feeding slots did not advance
+            losers = previous[:, 0::2] ^ previous[:, 1::2] ^ round_winners
+            self.upsets[r] += np.count_nonzero(seeds[round_winners] > seeds[losers])
+            previous = round_winners
+        self.num_tournaments += len(winners)
+        return self
+
+    def merge(self, other):
+        """Add another SimulationAggregates into this one in place."""
+        self.num_tournaments += other.num_tournaments
+        self.wins += other.wins
+        self.upsets += other.upsets
+        return self
+
+    def __add__(self, other):
+        return SimulationAggregates(
+            self.num_tournaments + other.num_tournaments,
+            self.wins + other.wins,
+            self.upsets + other.upsets,
+            self.topology,
+        )
+
+
+def _run_shard(n, rng, chunk_size, topology=DEFAULT_TOPOLOGY, odds=None, aggregates=None):
+    if aggregates is None:
+        aggregates = SimulationAggregates(topology=topology)
+    for start in range(0, n, chunk_size):
+        count = min(chunk_size, n - start)
+        aggregates.add_winners(simulate_tournaments(count, rng, chunk_size=chunk_size, odds=odds,
+                                                    topology=topology))
+    return aggregates
+
+
+def split_counts(n, workers):
+    """Split n tournaments into `workers` shard sizes that differ by at most one."""
+    base, extra = divmod(n, workers)
+    return [base + (1 if i < extra else 0) for i in range(workers)]
+
+
+def run_simulations(n, workers=None, seed=None, chunk_size=65536, topology=DEFAULT_TOPOLOGY,
+                    odds=None, aggregates=None):
+    """
+    Simulate n tournaments across a process pool and merge the aggregates.
+
+    Every shard gets its own generator spawned from one SeedSequence (see
+    calculate_odds.spawn_rngs), so the streams are statistically
+    independent and the merged aggregates are bit-identical for a given
+    (seed, workers, chunk_size).
+
+    Args:
+        n: Total number of tournaments
+        workers: Number of worker processes (defaults to os.cpu_count())
+        seed: int or SeedSequence for the root stream (fresh entropy if None)
+        chunk_size: Tournaments simulated per batch inside each worker
+        topology: bracket_topology.BracketTopology of the field
+        odds: Seed odds table or probability_models.ProbabilityModel
+            (defaults to calculate_odds.get_odds_table())
+        aggregates: Counters to add the tournaments to, e.g. an
+            aggregate_store.AggregateStore; worker shards are empty
+            instances of the same class. A new SimulationAggregates if None.
+
+    Returns:
+        SimulationAggregates: merged counters for all n tournaments
+        (aggregates itself when given)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, n)) if n > 0 else 1
+
+    counts = split_counts(n, workers)
+    rngs = spawn_rngs(seed, workers)
+
+    if workers == 1:
+        return _run_shard(counts[0], rngs[0], chunk_size, topology, odds, aggregates)
+
+    total = SimulationAggregates(topology=topology) if aggregates is None else aggregates
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_run_shard, count, rng, chunk_size, topology, odds, type(total)(topology=topology))
+            for count, rng in zip(counts, rngs)
+        ]
+        # Merge in submission order so results do not depend on timing
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+
+def run_until_converged(half_width=0.001, rounds=(-1,), confidence=0.95,
+                        time_budget=None, batch_size=10_000, max_batch_size=1_000_000,
+                        max_tournaments=None, workers=1, seed=None, chunk_size=65536,
+                        topology=DEFAULT_TOPOLOGY, odds=None):
+    """
+    Simulate in batches until every tracked probability is pinned down.
+
+    After each batch the confidence-interval half-width of P(team wins
+    round r) is checked for every team and every round in `rounds`; the
+    run stops once all of them are within `half_width`, or when the time
+    budget or tournament cap runs out. Half-widths shrink like 1/sqrt(n), so
+    after the first batch each batch is sized from the worst remaining
+    ratio to land just past the target instead of overshooting it.
+
+    Args:
+        half_width: Target half-width, a scalar or an array broadcastable
+            to (64, len(rounds)) for per-team targets
+        rounds: Rounds to track; the default tracks champion probabilities
+        confidence: Confidence level of the intervals
+        time_budget: Stop after this many seconds (no limit if None)
+        batch_size: Size of the first (and smallest) batch, split across
+            the workers
+        max_batch_size: Largest batch, so the budget is checked regularly
+        max_tournaments: Hard cap on tournaments (no limit if None)
+        workers: Worker processes per batch
+        seed: int or SeedSequence; batches draw successive spawned streams
+        topology: bracket_topology.BracketTopology of the field
+        odds: Seed odds table or probability_models.ProbabilityModel
+
+    Returns:
+        aggregates: SimulationAggregates over every tournament run
+        report: dict with 'num_tournaments', 'converged', 'max_half_width',
+            'worst_ratio' (largest achieved / target half-width) and
+            'elapsed' seconds
+    """
+    start = time.perf_counter()
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    rounds = list(rounds)
+    target = np.broadcast_to(half_width, (topology.num_teams, len(rounds)))
+
+    aggregates = SimulationAggregates(topology=topology)
+    count = batch_size
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while True:
+            if max_tournaments is not None:
+                count = min(count, max_tournaments - aggregates.num_tournaments)
+            if count <= 0:
+                break
+
+            rngs = spawn_rngs(root, workers)
+            if pool is None:
+                aggregates.merge(_run_shard(count, rngs[0], chunk_size, topology, odds))
+            else:
+                futures = [pool.submit(_run_shard, c, rng, chunk_size, topology, odds)
+                           for c, rng in zip(split_counts(count, workers), rngs) if c]
+                for future in futures:
+                    aggregates.merge(future.result())
+
+            ratio = (aggregates.half_widths(confidence)[:, rounds] / target).max()
+            if ratio <= 1:
+                break
+            if time_budget is not None and time.perf_counter() - start >= time_budget:
+                break
+            # n needed scales with ratio**2; aim 5% past it
+            needed = aggregates.num_tournaments * (ratio * ratio * 1.05 - 1)
+            count = min(max(batch_size, int(np.ceil(needed))), max_batch_size)
+            if time_budget is not None:
+                elapsed = time.perf_counter() - start
+                rate = aggregates.num_tournaments / elapsed
+                count = max(batch_size, min(count, int(rate * (time_budget - elapsed))))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    widths = aggregates.half_widths(confidence)[:, rounds]
+    report = {
+        "num_tournaments": aggregates.num_tournaments,
+        "converged": bool((widths <= target).all()),
+        "max_half_width": float(widths.max()),
+        "worst_ratio": float((widths / target).max()),
+        "elapsed": time.perf_counter() - start,
+    }
+    return aggregates, report
+
+
+def main():
+    num_simulations = 1000000
+    aggregates = run_simulations(num_simulations)
+
+    champion_seeds = np.bincount(TEAM_SEEDS, weights=aggregates.champion_counts, minlength=17)
+    print(f"\nWin counts by seed after {num_simulations} simulations:")
+    for seed in range(1, 17):
+        if champion_seeds[seed]:
+            print(f"Seed {seed}: {int(champion_seeds[seed])} wins")
+
+    print("\nUpsets per round:")
+    for r, count in enumerate(aggregates.upsets):
+        print(f"Round {r}: {count / num_simulations:.3f} per tournament")
+
+
+if __name__ == "__main__":
+    main()
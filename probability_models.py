@@ -0,0 +1,175 @@
+import numpy as np
+
+from calculate_odds import NUM_ROUNDS, get_winrate_table, get_odds_table
+from bracket_topology import DEFAULT_TOPOLOGY
+
+# Elo's convention: a 400-point gap is 10:1 odds
+ELO_SCALE = 400 / np.log(10)
+
+
+class ProbabilityModel:
+    """
+    Win-probability model over team indices.
+
+    Subclasses implement probability(), which must be vectorized: it takes
+    broadcastable arrays of team indices and rounds and returns
+    P(team_a beats team_b) for every element in one call. Parameters may
+    vary by round (arrays of shape (6, num_teams)) or not ((num_teams,)).
+
+    The simulator and exact solver never call probability() per game; they
+    evaluate it once over every pairing via team_table() and index into the
+    result.
+    """
+
+    def __init__(self, num_teams):
+        self.num_teams = num_teams
+        self._table = None
+
+    def probability(self, team_a, team_b, rounds):
+        """
+        P(team_a beats team_b in the given rounds).
+
+        Args:
+            team_a, team_b: Arrays of team indices
+            rounds: Array of tournament rounds (0-5)
+
+        Returns:
+            np.ndarray: Probabilities in the broadcast shape of the inputs
+        """
+        raise NotImplementedError
+
+    def team_table(self):
+        """
+        Dense (6, num_teams + 1, num_teams + 1) table of P(a beats b) per round.
+
+        The extra last row and column stand for a bye (see
+        bracket_topology.BracketTopology) and hold 0.5; the simulator
+        overrides every game against a bye anyway. Computed once per model.
+        """
+        if self._table is None:
+            teams = np.arange(self.num_teams)
+            rounds = np.arange(NUM_ROUNDS)[:, None, None]
+            table = np.full((NUM_ROUNDS, self.num_teams + 1, self.num_teams + 1), 0.5)
+            table[:, :-1, :-1] = self.probability(teams[:, None], teams[None, :], rounds)
+            self._table = table
+        return self._table
+
+    @classmethod
+    def for_seeds(cls, seed_values, topology=DEFAULT_TOPOLOGY, **kwargs):
+        """
+        Build a model from per-seed parameters.
+
+        Args:
+            seed_values: Parameters per seed, shape (16,) or (6, 16); seed s
+                is at index s - 1. Seeds above 16 use the 16-seed value.
+            topology: Field whose teams the model is built for
+            **kwargs: Passed on to the model's constructor
+        """
+        seed_idx = topology.odds_seed_index[:topology.num_teams]
+        return cls(np.asarray(seed_values, dtype=float)[..., seed_idx], **kwargs)
+
+    def __getstate__(self):
+        # Worker processes rebuild the table rather than receive it
+        state = self.__dict__.copy()
+        state["_table"] = None
+        return state
+
+
+def _per_round(values, teams, rounds):
+    """Index (num_teams,) or (6, num_teams) parameters by team and round."""
+    if values.ndim == 1:
+        return values[teams]
+    return values[rounds, teams]
+
+
+class BradleyTerryModel(ProbabilityModel):
+    """
+    Bradley-Terry model: P(a beats b) = s_a / (s_a + s_b).
+
+    Args:
+        strengths: Positive strengths, (num_teams,) or (6, num_teams)
+    """
+
+    def __init__(self, strengths):
+        self.strengths = np.asarray(strengths, dtype=float)
+        super().__init__(self.strengths.shape[-1])
+
+    def probability(self, team_a, team_b, rounds):
+        strength_a = _per_round(self.strengths, team_a, rounds)
+        strength_b = _per_round(self.strengths, team_b, rounds)
+        return strength_a / (strength_a + strength_b)
+
+
+class SeedRatioModel(BradleyTerryModel):
+    """
+    The winrate1 / (winrate1 + winrate2) odds from calculate_odds.get_odds.
+
+    This is a Bradley-Terry model whose per-round strength of a team is its
+    seed's winrate in that round, so it reproduces get_odds_table() for
+    every pairing.
+
+    Args:
+        winrates: (6, 16) per-(round, seed) winrates (defaults to
+            calculate_odds.get_winrate_table())
+        topology: Field whose teams the model is built for
+    """
+
+    def __init__(self, winrates=None, topology=DEFAULT_TOPOLOGY):
+        if winrates is None:
+            winrates = get_winrate_table()
+        seed_idx = topology.odds_seed_index[:topology.num_teams]
+        super().__init__(np.asarray(winrates, dtype=float)[:, seed_idx])
+
+
+class LogisticModel(ProbabilityModel):
+    """
+    Logistic model on rating differences:
+    P(a beats b) = 1 / (1 + exp(-(r_a - r_b) / scale)).
+
+    Args:
+        ratings: Ratings, (num_teams,) or (6, num_teams)
+        scale: Rating difference that multiplies the odds by e
+    """
+
+    def __init__(self, ratings, scale=1.0):
+        self.ratings = np.asarray(ratings, dtype=float)
+        self.scale = scale
+        super().__init__(self.ratings.shape[-1])
+
+    def probability(self, team_a, team_b, rounds):
+        diff = _per_round(self.ratings, team_a, rounds) - _per_round(self.ratings, team_b, rounds)
+        return 1 / (1 + np.exp(-diff / self.scale))
+
+
+class EloModel(LogisticModel):
+    """
+    Elo model: P(a beats b) = 1 / (1 + 10 ** (-(r_a - r_b) / 400)).
+
+    Args:
+        ratings: Elo ratings, (num_teams,) or (6, num_teams)
+    """
+
+    def __init__(self, ratings):
+        super().__init__(ratings, scale=ELO_SCALE)
+
+
+def resolve_odds(odds=None, topology=DEFAULT_TOPOLOGY):
+    """
+    Normalize an odds argument into a lookup table and index.
+
+    Args:
+        odds: A ProbabilityModel, a (6, 16, 16) seed odds table, or None
+            for calculate_odds.get_odds_table()
+        topology: Field the team indices refer to
+
+    Returns:
+        table, index: P(team a beats team b in odds-table round r) is
+        table[r, index[a], index[b]]; index also covers the bye
+    """
+    if odds is None:
+        odds = get_odds_table()
+    if isinstance(odds, ProbabilityModel):
+        if odds.num_teams != topology.num_teams:
+            raise ValueError(f"Model is for {odds.num_teams} teams, field has {topology.num_teams}")
+        return odds.team_table(), np.arange(topology.num_teams + 1)
+    return odds, topology.odds_seed_index
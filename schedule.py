@@ -0,0 +1,113 @@
+import functools
+
+import numpy as np
+
+from bracket import MIN_SPLIT_GAMES, NUM_REGIONS, ROUND_DAYS
+from bracket_topology import DEFAULT_TOPOLOGY
+
+
+class Schedule:
+    """
+    Fixed (round, day) slot of every game of a bracket topology.
+
+    A round with at least MIN_SPLIT_GAMES real games is played over two
+    days. Within each region the first half of the round's games (in slot
+    order) is on day 1 and the rest on day 2, so a pod's winners play on
+    the same day of the next round; rounds with fewer games per region than
+    that (the Elite 8, the First Four) put the first half of the bracket on
+    day 1. Games between byes are not played and get day 0.
+
+    Everything is computed once, so every lookup below is an array index.
+
+    Attributes:
+        topology: The bracket_topology.BracketTopology scheduled
+        game_rounds: (num_games,) round of each winners column
+        game_days: (num_games,) day within the round (1 or 2, 0 for byes);
+            the 'day' column of bracket_results.csv
+        game_dates: (num_games,) tournament day counted from 1 across all
+            rounds (0 for byes)
+        num_dates: Number of tournament days
+        date_rounds, date_days: (num_dates + 1,) round and day-in-round of
+            each tournament day (index 0 unused)
+        team_games: (num_teams, num_rounds) winners column of the game a
+            team plays in each round, should it get there
+        team_dates: (num_teams, num_rounds) tournament day of those games
+    """
+
+    def __init__(self, topology=DEFAULT_TOPOLOGY):
+        self.topology = topology
+        occupied = topology.slots != topology.bye
+        num_slots = len(topology.slots)
+
+        self.game_rounds = np.empty(topology.num_games, dtype=np.int8)
+        self.game_days = np.zeros(topology.num_games, dtype=np.int8)
+        for r in range(topology.num_rounds):
+            cols = topology.round_columns(r)
+            games = topology.games_per_round[r]
+            self.game_rounds[cols] = r
+
+            # A game is played when both feeder subtrees hold a team
+            sides = occupied.reshape(games, 2, num_slots // (2 * games)).any(axis=2)
+            real = np.flatnonzero(sides.all(axis=1))
+            days = np.ones(len(real), dtype=np.int8)
+            if len(real) >= MIN_SPLIT_GAMES:
+                region = real * NUM_REGIONS // games
+                rank = np.arange(len(real)) - np.searchsorted(region, region)
+                per_region = np.bincount(region, minlength=NUM_REGIONS)[region]
+                if per_region.min() >= 2:
+                    days[rank >= per_region // 2] = 2
+                else:
+                    days[len(real) // 2:] = 2
+            self.game_days[topology.round_offsets[r] + real] = days
+
+        # Number the (round, day) pairs that hold games in order
+        played = self.game_days > 0
+        keys = self.game_rounds.astype(np.int32) * 4 + self.game_days
+        unique_keys = np.unique(keys[played])
+        self.num_dates = len(unique_keys)
+        self.game_dates = np.zeros(topology.num_games, dtype=np.int16)
+        self.game_dates[played] = np.searchsorted(unique_keys, keys[played]) + 1
+        self.date_rounds = np.concatenate(([-1], unique_keys // 4)).astype(np.int8)
+        self.date_days = np.concatenate(([0], unique_keys % 4)).astype(np.int8)
+
+        # Columns of each tournament day, as slices of one sorted array
+        order = np.argsort(self.game_dates, kind="stable")
+        bounds = np.searchsorted(self.game_dates[order], np.arange(self.num_dates + 2))
+        self._date_games = [order[bounds[d]:bounds[d + 1]] for d in range(self.num_dates + 1)]
+
+        self.team_games = np.empty((topology.num_teams, topology.num_rounds), dtype=np.intp)
+        for r in range(topology.num_rounds):
+            self.team_games[:, r] = topology.round_offsets[r] + (topology.positions >> (r + 1))
+        self.team_dates = self.game_dates[self.team_games]
+
+    def date(self, tournament_round, day):
+        """Tournament day of (round, day-in-round), or 0 if no games then."""
+        match = np.flatnonzero((self.date_rounds == tournament_round) & (self.date_days == day))
+        return int(match[0]) if len(match) else 0
+
+    def games_on(self, date):
+        """Winners columns of the games played on a tournament day."""
+        return self._date_games[date]
+
+    def team_date(self, team, tournament_round):
+        """Tournament day of team's game in tournament_round."""
+        return int(self.team_dates[team, tournament_round])
+
+    def __repr__(self):
+        return f"Schedule({self.topology!r}, days={self.num_dates})"
+
+
+@functools.lru_cache(maxsize=None)
+def get_schedule(topology=DEFAULT_TOPOLOGY):
+    """The Schedule of a topology, built once and reused."""
+    return Schedule(topology)
+
+
+def _check_scalar_days():
+    """bracket.py's pure-Python day table must agree with the default schedule."""
+    scalar_days = [day for days in ROUND_DAYS for day in days]
+    if get_schedule().game_days.tolist() != scalar_days:
+        raise RuntimeError("bracket.ROUND_DAYS does not match schedule.Schedule's game days")
+
+
+_check_scalar_days()
@@ -0,0 +1,254 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+TOURNAMENT_DATA_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tournament_data.csv")
+MASK_BITS = 64
+
+
+def load_tournament_data(csv_path=TOURNAMENT_DATA_CSV):
+    """
+    Per-team, per-game rows of tournament_data.csv.
+
+    Columns: team, seed, odds (P(team wins the game)), day,
+    tournament_round, opponent. Every game appears twice, once from each
+    side; team and opponent are 1-based team numbers.
+    """
+    return pd.read_csv(csv_path)
+
+
+class SurvivorPlanner:
+    """
+    Pick planner for the one-team-per-game-day survivor pool that
+    MarchMadnessEnv models: each entry picks a team playing that day,
+    survives if it wins and may never pick the same team twice.
+
+    Each (tournament_round, day) pair in the data is one pick day. An
+    entry's chance of surviving a plan is the product of its picks' odds,
+    with games treated as independent and the data's matchups as the ones
+    that will be played.
+
+    The search is a forward DP over (pick day, used-team set): partial
+    plans that reach a day with the same used set compete for one state,
+    since they face the same future, and only the best beam_width states
+    survive each day. With a beam at least as large as the number of
+    distinct used sets the result is exact. States are ranked by their
+    score plus an optimistic bound on the remaining days, so the beam keeps
+    the used sets that leave good teams for later. Searches are cached by
+    start state, so entries that share a history share one search.
+
+    Attributes:
+        pick_days: (round, day) of each pick day, in order
+        teams, log_odds, games: Per pick day, the 0-based team indices
+            playing, their log win probabilities and the index of their
+            game in game_teams
+        game_teams: (num_games, 2) 0-based teams of every game
+        game_odds: (num_games, 2) their win probabilities
+    """
+
+    def __init__(self, data=None, beam_width=4096):
+        if data is None:
+            data = load_tournament_data()
+        self.beam_width = beam_width
+        team = data["team"].to_numpy(dtype=np.intp) - 1
+        opponent = data["opponent"].to_numpy(dtype=np.intp) - 1
+        if team.min() < 0 or team.max() >= MASK_BITS:
+            raise ValueError(f"Team numbers must be between 1 and {MASK_BITS}")
+        odds = data["odds"].to_numpy(dtype=float)
+        keys = data["tournament_round"].to_numpy(dtype=np.int64) * 4 + data["day"].to_numpy(dtype=np.int64)
+
+        # One game per (pick day, pair of teams); rows come from both sides
+        game_keys = (keys * MASK_BITS + np.minimum(team, opponent)) * MASK_BITS + np.maximum(team, opponent)
+        unique_games, row_games = np.unique(game_keys, return_inverse=True)
+        self.game_teams = np.empty((len(unique_games), 2), dtype=np.intp)
+        self.game_odds = np.empty((len(unique_games), 2))
+        side = (team > opponent).astype(np.intp)
+        self.game_teams[row_games, side] = team
+        self.game_odds[row_games, side] = odds
+
+        day_keys = np.unique(keys)
+        self.pick_days = [(int(k // 4), int(k % 4)) for k in day_keys]
+        with np.errstate(divide="ignore"):
+            log_odds = np.log(odds)
+        self.teams, self.log_odds, self.games = [], [], []
+        for k in day_keys:
+            rows = np.flatnonzero(keys == k)
+            self.teams.append(team[rows])
+            self.log_odds.append(log_odds[rows])
+            self.games.append(row_games[rows])
+        self._cache = {}
+
+    @property
+    def num_days(self):
+        return len(self.pick_days)
+
+    def search(self, start=0, used=()):
+        """
+        Beam DP from pick day start with the given teams already used.
+
+        Returns:
+            tuple: (paths, log_survival) for the final beam, best first;
+            paths is (k, num_days - start) 0-based team picks. Empty when no
+            plan can cover every remaining day.
+        """
+        mask = 0
+        for t in used:
+            mask |= 1 << int(t)
+        key = (start, mask)
+        if key not in self._cache:
+            self._cache[key] = self._search(start, mask)
+        return self._cache[key]
+
+    def _search(self, start, mask):
+        masks = np.array([mask], dtype=np.uint64)
+        scores = np.zeros(1)
+        parents, picks = [], []
+        for d in range(start, self.num_days):
+            teams = self.teams[d]
+            bits = np.uint64(1) << teams.astype(np.uint64)
+            free = (masks[:, None] & bits) == 0
+            states, choices = np.nonzero(free)
+            if not len(states):
+                return np.empty((0, self.num_days - start), dtype=np.intp), np.empty(0)
+            new_masks = masks[states] | bits[choices]
+            new_scores = scores[states] + self.log_odds[d][choices]
+
+            # Best plan per used set, then the beam_width used sets with the
+            # best score plus optimistic bound on the days still to come
+            order = np.argsort(-new_scores, kind="stable")
+            _, first = np.unique(new_masks[order], return_index=True)
+            keep = order[first]
+            if len(keep) > self.beam_width:
+                priority = new_scores[keep] + self._future_bound(new_masks[keep], d + 1)
+                keep = keep[np.argpartition(-priority, self.beam_width - 1)[:self.beam_width]]
+            keep = keep[np.argsort(-new_scores[keep], kind="stable")]
+
+            masks, scores = new_masks[keep], new_scores[keep]
+            parents.append(states[keep])
+            picks.append(teams[choices[keep]])
+
+        # Walk the back-pointers from the final beam
+        paths = np.empty((len(masks), len(picks)), dtype=np.intp)
+        state = np.arange(len(masks))
+        for d in range(len(picks) - 1, -1, -1):
+            paths[:, d] = picks[d][state]
+            state = parents[d][state]
+        return paths, scores
+
+    def _future_bound(self, masks, start):
+        """
+        Upper bound on the log survival still to come for each used set:
+        every remaining day's best unused team, ignoring that later days
+        may want the same team.
+        """
+        bound = np.zeros(len(masks))
+        for d in range(start, self.num_days):
+            bits = np.uint64(1) << self.teams[d].astype(np.uint64)
+            free = (masks[:, None] & bits) == 0
+            bound += np.where(free, self.log_odds[d], -np.inf).max(axis=1)
+        return bound
+
+    def game_sides(self, paths, start):
+        """Side (0/1) each path from search(start) backs in every game, -1 for none."""
+        sides = np.full((len(paths), len(self.game_teams)), -1, dtype=np.intp)
+        for j, d in enumerate(range(start, self.num_days)):
+            games = self.games[d][_positions(self.teams[d], paths[:, j])]
+            sides[np.arange(len(paths)), games] = (self.game_teams[games, 1] == paths[:, j])
+        return sides
+
+    def joint_survival(self, sides):
+        """
+        P(every plan in a set survives), for plans given as game sides.
+
+        Args:
+            sides: (..., m, num_games) sides from game_sides
+
+        Returns:
+            np.ndarray: (...) probabilities; 0 where two plans back
+            opposite sides of a game
+        """
+        picked_0 = (sides == 0).any(axis=-2)
+        picked_1 = (sides == 1).any(axis=-2)
+        odds = np.where(picked_0, self.game_odds[:, 0], 1.0) * np.where(picked_1, self.game_odds[:, 1], 1.0)
+        return np.where((picked_0 & picked_1).any(axis=-1), 0.0, odds.prod(axis=-1))
+
+    def plan(self, num_entries=5, used=None, start=0, candidates=512):
+        """
+        Plans for a pool's entries.
+
+        Entries with the same history share one search. Entries sharing a
+        search are then filled greedily from its final beam (the best
+        candidates plans), each time adding the plan that most increases
+        P(at least one of these entries survives), so they hedge rather
+        than all backing the same path.
+
+        Args:
+            num_entries: Entries in the pool
+            used: Per entry, the teams (0-based) it has already used
+            start: First pick day to plan
+            candidates: Plans from each beam considered for the entries
+
+        Returns:
+            dict: 'paths' (per entry, a list of (pick day, team) picks),
+            'survival' (per entry, P(it survives every day)) and
+            'pool_survival' (P(at least one entry survives))
+        """
+        if used is None:
+            used = [()] * num_entries
+        groups = {}
+        for entry, entry_used in enumerate(used):
+            groups.setdefault(frozenset(int(t) for t in entry_used), []).append(entry)
+
+        entry_paths = [None] * num_entries
+        entry_survival = np.zeros(num_entries)
+        entry_sides = []
+        for entry_used, entries in groups.items():
+            paths, scores = self.search(start, entry_used)
+            paths = paths[:candidates]
+            sides = self.game_sides(paths, start)
+            chosen = self._hedge(sides, len(entries))
+            for entry, index in zip(entries, chosen):
+                entry_paths[entry] = [(start + d, int(t)) for d, t in enumerate(paths[index])]
+                entry_survival[entry] = np.exp(scores[index])
+                entry_sides.append(sides[index])
+
+        return {
+            "paths": entry_paths,
+            "survival": entry_survival,
+            "pool_survival": self._union_survival(np.array(entry_sides)) if entry_sides else 0.0,
+        }
+
+    def _union_survival(self, sides):
+        """P(at least one of the plans survives), by inclusion-exclusion."""
+        total = 0.0
+        for subset in range(1, 1 << len(sides)):
+            members = [i for i in range(len(sides)) if subset >> i & 1]
+            sign = 1 if len(members) % 2 else -1
+            total += sign * self.joint_survival(sides[members])
+        return float(total)
+
+    def _hedge(self, sides, k):
+        """Greedily pick k candidate indices maximizing P(any survives)."""
+        if not len(sides):
+            return []
+        chosen = []
+        # Signed joint-survival terms of every non-empty subset chosen so far
+        subsets = []
+        for _ in range(k):
+            gain = self.joint_survival(sides[:, None, :])
+            for sign, members in subsets:
+                combined = np.concatenate((np.broadcast_to(members, (len(sides),) + members.shape),
+                                           sides[:, None, :]), axis=1)
+                gain = gain - sign * self.joint_survival(combined)
+            best = int(np.argmax(gain))
+            subsets = subsets + [(-sign, np.vstack((members, sides[best])))
+                                 for sign, members in subsets] + [(1, sides[best][None, :])]
+            chosen.append(best)
+        return chosen
+
+
+def _positions(values, targets):
+    """Index in values of each target (values unique)."""
+    order = np.argsort(values)
+    return order[np.searchsorted(values, targets, sorter=order)]